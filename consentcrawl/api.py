@@ -7,15 +7,36 @@ Designed for Railway deployment with browser lifecycle management.
 
 import logging
 import asyncio
-from typing import Optional, Dict, Any
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Awaitable, Callable
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, HttpUrl, Field
 from playwright.async_api import async_playwright
 
-from consentcrawl.audit_crawl import audit_url
+if sys.version_info >= (3, 11):
+    from asyncio import timeout
+else:
+    from async_timeout import timeout
+
+from consentcrawl.audit_crawl import audit_url, BrowserPool, refresh_tracking_domains
 from consentcrawl.audit_schemas import AuditConfig
+from consentcrawl.utils import get_consent_managers
+from consentcrawl.constants import (
+    AUDIT_CACHE_MAX_SIZE,
+    AUDIT_CACHE_TTL,
+    BLOCKLISTS_REFRESH_INTERVAL,
+    BROWSER_MAX_AUDITS,
+    BROWSER_POOL_SIZE,
+    CONTEXT_POOL_SIZE,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -29,7 +50,8 @@ app = FastAPI(
     description="Cookie consent banner audit API for N8N integration",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware for N8N integration
@@ -40,9 +62,92 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global browser instance (initialized on startup)
-browser = None
+# Global browser pool (initialized on startup)
 playwright_instance = None
+browser_pool = None
+blocklists_refresh_task = None
+
+# Shared config for requests without overrides (treated as read-only)
+DEFAULT_CONFIG = AuditConfig()
+
+
+class AuditResultCache:
+    """
+    In-memory LRU cache of audit results with a time-to-live.
+
+    Concurrent requests for the same key are coalesced: the first one starts
+    the audit and the others await the same task instead of auditing again.
+    Results with an "error" status are not cached.
+    """
+
+    def __init__(self, maxsize: int = AUDIT_CACHE_MAX_SIZE, ttl: int = AUDIT_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def make_key(url: str, config: AuditConfig, screenshot: bool) -> str:
+        payload = json.dumps(
+            {"url": url, "config": config.to_dict(), "screenshot": screenshot},
+            sort_keys=True,
+        )
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: dict):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def get_or_run(self, key: str, run: Callable[[], Awaitable[dict]], use_cache: bool = True) -> dict:
+        """
+        Return the cached result for key, or await run() to produce it.
+
+        With use_cache=False the cached entry is ignored, but an audit already
+        in flight for the same key is still shared.
+        """
+        if use_cache:
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(run())
+            self._pending[key] = task
+            task.add_done_callback(lambda t: self._on_done(key, t))
+
+        # Shield so one disconnecting client doesn't cancel the shared audit
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: str, task: asyncio.Task):
+        self._pending.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+
+        result = task.result()
+        if result.get("status") != "error":
+            self.set(key, result)
+
+
+result_cache = AuditResultCache(
+    maxsize=int(os.getenv("CACHE_MAX_SIZE", AUDIT_CACHE_MAX_SIZE)),
+    ttl=int(os.getenv("CACHE_TTL_SECONDS", AUDIT_CACHE_TTL)),
+)
 
 
 # Pydantic Models
@@ -122,17 +227,30 @@ class HealthResponse(BaseModel):
 @app.on_event("startup")
 async def startup_event():
     """
-    Initialize browser on application startup.
+    Initialize the browser pool on application startup.
 
     Railway will call this when the container starts.
     Uses headless mode with no-sandbox for containerized environments.
+    Pool sizes can be tuned with the BROWSER_POOL_SIZE, BROWSER_MAX_AUDITS
+    and CONTEXT_POOL_SIZE environment variables.
     """
-    global browser, playwright_instance
+    global playwright_instance, browser_pool, blocklists_refresh_task
+
+    # Build the OpenAPI schema and load the CMP configs now rather than on
+    # the first request
+    app.openapi()
+    get_consent_managers()
+
+    blocklists_refresh_task = asyncio.create_task(refresh_blocklists_periodically())
 
     try:
-        logging.info("Starting Playwright browser...")
+        logging.info("Starting Playwright browsers...")
         playwright_instance = await async_playwright().start()
-        browser = await playwright_instance.chromium.launch(
+        browser_pool = BrowserPool(
+            playwright_instance,
+            size=int(os.getenv("BROWSER_POOL_SIZE", BROWSER_POOL_SIZE)),
+            max_audits=int(os.getenv("BROWSER_MAX_AUDITS", BROWSER_MAX_AUDITS)),
+            contexts_per_browser=int(os.getenv("CONTEXT_POOL_SIZE", CONTEXT_POOL_SIZE)),
             headless=True,
             args=[
                 '--no-sandbox',
@@ -141,7 +259,8 @@ async def startup_event():
                 '--disable-blink-features=AutomationControlled'
             ]
         )
-        logging.info("✓ Browser launched successfully")
+        await browser_pool.start()
+        logging.info(f"✓ Browser pool ready ({browser_pool.size} browsers)")
     except Exception as e:
         logging.error(f"Failed to launch browser: {e}")
         raise
@@ -150,16 +269,19 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """
-    Cleanup browser on application shutdown.
+    Cleanup browser pool on application shutdown.
 
     Ensures proper resource cleanup when Railway stops the container.
     """
-    global browser, playwright_instance
+    global playwright_instance, browser_pool, blocklists_refresh_task
+
+    if blocklists_refresh_task:
+        blocklists_refresh_task.cancel()
 
     try:
-        if browser:
-            await browser.close()
-            logging.info("Browser closed")
+        if browser_pool:
+            await browser_pool.close()
+            logging.info("Browser pool closed")
 
         if playwright_instance:
             await playwright_instance.stop()
@@ -168,6 +290,21 @@ async def shutdown_event():
         logging.error(f"Error during shutdown: {e}")
 
 
+async def refresh_blocklists_periodically():
+    """
+    Pick up refreshed blocklists without restarting the service.
+
+    Checks the blocklists database every BLOCKLISTS_REFRESH_INTERVAL seconds
+    in a worker thread, so audits never pay for reloading tracking domains.
+    """
+    while True:
+        await asyncio.sleep(BLOCKLISTS_REFRESH_INTERVAL)
+        try:
+            await asyncio.to_thread(refresh_tracking_domains)
+        except Exception as e:
+            logging.warning(f"Blocklists refresh failed: {e}")
+
+
 # API Endpoints
 @app.get("/", response_model=Dict[str, Any])
 async def root():
@@ -182,7 +319,7 @@ async def root():
         "version": "1.0.0",
         "description": "Cookie consent banner audit API for N8N integration",
         "endpoints": {
-            "POST /audit": "Audit a URL for cookie consent compliance",
+            "POST /audit": "Audit a URL for cookie consent compliance (cached, ?no_cache=1 to force a new audit)",
             "GET /health": "Health check for Railway monitoring",
             "GET /docs": "Interactive API documentation (Swagger UI)",
             "GET /redoc": "Alternative API documentation (ReDoc)"
@@ -201,8 +338,8 @@ async def health_check():
     Returns:
         Health status including browser state
     """
-    browser_status = "ready" if browser else "not_ready"
-    is_healthy = browser is not None
+    is_healthy = browser_pool is not None and browser_pool.ready
+    browser_status = "ready" if is_healthy else "not_ready"
 
     return {
         "status": "healthy" if is_healthy else "degraded",
@@ -212,15 +349,18 @@ async def health_check():
 
 
 @app.post("/audit", response_model=AuditResponse)
-async def audit_endpoint(request: AuditRequest):
+async def audit_endpoint(request: AuditRequest, no_cache: bool = False):
     """
     Audit a single URL for cookie consent compliance.
 
     This endpoint synchronously waits for the audit to complete before returning.
     Typical execution time: 30-90 seconds depending on site complexity.
+    Results are cached per URL and config (CACHE_TTL_SECONDS, default 24h) and
+    simultaneous requests for the same URL share a single audit.
 
     Args:
         request: AuditRequest with URL and optional config
+        no_cache: Ignore any cached result and run a new audit
 
     Returns:
         Complete AuditResult with banner info, categories, vendors, and cookies
@@ -231,7 +371,7 @@ async def audit_endpoint(request: AuditRequest):
         HTTPException 500: Internal server error
     """
     # Check browser availability
-    if not browser:
+    if not browser_pool or not browser_pool.ready:
         logging.error("Audit requested but browser not initialized")
         raise HTTPException(
             status_code=503,
@@ -240,21 +380,29 @@ async def audit_endpoint(request: AuditRequest):
 
     try:
         # Parse config overrides
-        config = AuditConfig(**request.config) if request.config else AuditConfig()
+        config = AuditConfig(**request.config) if request.config else DEFAULT_CONFIG
+
+        url = str(request.url)
+        cache_key = result_cache.make_key(url, config, request.screenshot)
+
+        async def run_audit() -> dict:
+            logging.info(f"Starting audit for: {url}")
 
-        logging.info(f"Starting audit for: {request.url}")
+            # Run audit with 120s timeout on the next browser of the pool
+            async with browser_pool.lease() as context_pool:
+                async with timeout(120):  # 2 minutes max
+                    result = await audit_url(
+                        url=url,
+                        context_pool=context_pool,
+                        config=config,
+                        screenshot=request.screenshot
+                    )
+
+            # Convert AuditResult to dict
+            return result.to_dict()
 
-        # Run audit with 120s timeout
         try:
-            result = await asyncio.wait_for(
-                audit_url(
-                    url=str(request.url),
-                    browser=browser,
-                    config=config,
-                    screenshot=request.screenshot
-                ),
-                timeout=120  # 2 minutes max
-            )
+            result_dict = await result_cache.get_or_run(cache_key, run_audit, use_cache=not no_cache)
         except asyncio.TimeoutError:
             logging.error(f"Audit timeout for {request.url}")
             raise HTTPException(
@@ -262,10 +410,7 @@ async def audit_endpoint(request: AuditRequest):
                 detail="Audit timeout after 120 seconds. Site may be too complex or slow."
             )
 
-        # Convert AuditResult to dict
-        result_dict = result.to_dict()
-
-        logging.info(f"Audit completed for {request.url}: {result.status}")
+        logging.info(f"Audit completed for {request.url}: {result_dict['status']}")
 
         return result_dict
 
@@ -286,24 +431,27 @@ async def audit_endpoint(request: AuditRequest):
 @app.exception_handler(404)
 async def not_found_handler(request: Request, exc):
     """Custom 404 handler."""
-    return {
+    return ORJSONResponse(status_code=404, content={
         "error": "Not found",
         "message": f"The endpoint {request.url.path} does not exist",
         "available_endpoints": ["/", "/health", "/audit", "/docs"]
-    }
+    })
 
 
 if __name__ == "__main__":
     import uvicorn
-    import os
-    
+
     port = int(os.getenv("PORT", 8000))
     logging.info(f"Starting ConsentCrawl API server on port {port}...")
     
+    # uvloop and httptools come with uvicorn[standard]; the access log costs a
+    # formatted line per request, so it is opt-in with ACCESS_LOG=1
     uvicorn.run(
         "consentcrawl.api:app",
         host="0.0.0.0",
         port=port,
+        loop="uvloop",
+        http="httptools",
         log_level="info",
-        access_log=True
+        access_log=os.getenv("ACCESS_LOG", "0") == "1"
     )
@@ -6,144 +6,588 @@ This module orchestrates the complete audit pipeline:
 2. Detect cookie banner
 3. Extract banner information
 4. Explore consent UI
-5. Store results in SQLite and JSON files
+5. Store results in SQLite, JSON files and an audit_results.jsonl stream
 
 Mirrors the structure of crawl.py but for audit mode.
 """
 
 # Standard library imports
 import asyncio
-import base64
+import collections
 import datetime
-import json
+import functools
+import hashlib
+import itertools
 import logging
 import os
 import re
 import sqlite3
+import tempfile
+import threading
 import time
+from binascii import b2a_base64
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple, Union
+from urllib.parse import urlsplit
 
 # Third-party imports
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+import orjson
+from playwright.async_api import (
+    async_playwright,
+    Browser,
+    BrowserContext,
+    CDPSession,
+    Page,
+    TimeoutError as PlaywrightTimeoutError,
+)
 
 # Local imports
-from consentcrawl.audit_schemas import AuditResult, AuditConfig, ConsentUIContext
+from consentcrawl.audit_schemas import AuditResult, AuditConfig, ConsentUIContext, get_audit_schema
 from consentcrawl.banner_detector import detect_banner
-from consentcrawl.blocklists import Blocklists
-from consentcrawl.ui_explorer import explore_consent_ui
-from consentcrawl.utils import get_consent_managers
+from consentcrawl.blocklists import Blocklists, blocklists_stale
+from consentcrawl.constants import (
+    BANNER_APPEAR_TIMEOUT,
+    BLOCKED_URL_PATTERNS,
+    BLOCKLISTS_MAX_AGE_DAYS,
+    BROWSER_MAX_AUDITS,
+    BROWSER_POOL_SIZE,
+    CONSENT_HINT_SELECTOR,
+    CONTEXT_MAX_USES,
+    CONTEXT_POOL_SIZE,
+    PAGE_LOAD_TIMEOUT,
+    PAGE_READY_WAIT,
+    SCREENSHOT_DIR,
+    SCREENSHOT_JPEG_QUALITY,
+    WRITER_FLUSH_INTERVAL,
+    WRITER_MAX_BATCH,
+)
+from consentcrawl.ui_explorer import attempt_detailed_extraction, explore_consent_ui
+from consentcrawl.utils import get_consent_managers, get_request_host, process_network_requests
 
 
 DEFAULT_UA_STRINGS = [
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 13_5_2) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36 Edg/116.0.1938.81"
 ]
 
-from consentcrawl.blocklists import Blocklists
+_DOMAIN_RE = re.compile(r"^(?:https?://)?(?:www\.)?([^/]+)")
+_SAFE_FNAME_RE = re.compile(r'[^a-zA-Z0-9_-]')
 
-# Initialize blocklists (singleton-like)
-try:
-    BLOCKLISTS = Blocklists()
-    TRACKING_DOMAINS = set(BLOCKLISTS.get_domains())
-except Exception as e:
-    logging.warning(f"Failed to initialize blocklists: {e}")
-    TRACKING_DOMAINS = set()
 
+def load_tracking_domains() -> frozenset:
+    """Load the set of known tracking domains from the blocklists database."""
+    try:
+        blocklists = Blocklists(max_age_days=BLOCKLISTS_MAX_AGE_DAYS)
+        try:
+            return frozenset(blocklists.get_domains())
+        finally:
+            blocklists.close()
+    except Exception as e:
+        logging.warning(f"Failed to initialize blocklists: {e}")
+        return frozenset()
+
+
+def get_blocklists_mtime() -> float:
+    """Modification time of the blocklists database, or 0 if it does not exist."""
+    try:
+        return os.path.getmtime(Blocklists.DB_FILE)
+    except OSError:
+        return 0.0
 
-async def audit_url(url: str, browser, config: AuditConfig, screenshot: bool = False) -> AuditResult:
+
+# Initialize blocklists once per process (singleton-like)
+TRACKING_DOMAINS = load_tracking_domains()
+_blocklists_mtime = get_blocklists_mtime()
+
+
+def refresh_tracking_domains() -> bool:
     """
-    Complete audit pipeline for a single URL.
+    Reload TRACKING_DOMAINS if the blocklists database changed on disk or is
+    old enough to be fetched again.
+
+    Cheap when nothing changed (a single stat call), so it can be polled
+    periodically by long-running processes.
+
+    Returns:
+        True if the tracking domains were reloaded
     """
-    # Create audit result with default values
-    domain_name = re.search(r"^(?:https?://)?(?:www\.)?([^/]+)", url).group(1) if url else "unknown"
-    result_id = base64.b64encode(domain_name.encode()).decode("utf-8")
+    global TRACKING_DOMAINS, _blocklists_mtime
 
-    audit_result = AuditResult(
-        id=result_id,
-        url=url,
-        domain_name=domain_name,
-        extraction_datetime=datetime.datetime.now().isoformat(),
-        status="pending",
-    )
+    # Same staleness rule as Blocklists, which only fetches again past it:
+    # reloading earlier would just reopen the same data
+    mtime = get_blocklists_mtime()
+    if mtime == _blocklists_mtime and not blocklists_stale(mtime, BLOCKLISTS_MAX_AGE_DAYS):
+        return False
 
-    import time
-    start_time = time.time()
-    
-    try:
-        # Create browser context with random user agent
-        context = await browser.new_context(
+    TRACKING_DOMAINS = load_tracking_domains()
+    _blocklists_mtime = get_blocklists_mtime()
+    logging.info(f"Reloaded {len(TRACKING_DOMAINS)} tracking domains from blocklists")
+    return True
+
+
+def get_frame_origins(context: BrowserContext) -> set:
+    """Origins (scheme://host[:port]) of the http(s) frames of every page of context."""
+    origins = set()
+    for page in context.pages:
+        for frame in page.frames:
+            parts = urlsplit(frame.url)
+            if parts.scheme in ("http", "https") and parts.netloc:
+                origins.add(f"{parts.scheme}://{parts.netloc}")
+    return origins
+
+
+@dataclass
+class PooledContext:
+    """
+    A browser context owned by a ContextPool, with its usage counter.
+
+    page is the page of the current audit and cdp its CDP session, on which
+    resource blocking is installed. Both are replaced between audits.
+    """
+    context: BrowserContext
+    page: Page
+    cdp: CDPSession
+    uses: int = 0
+
+
+class ContextPool:
+    """
+    Pool of pre-warmed browser contexts shared by concurrent audits.
+
+    Contexts are created up front with the user agent, viewport, init script,
+    a page and its resource blocking already applied, then handed out through
+    an asyncio.Queue. Between audits a context is reset instead of being torn
+    down: the storage of every origin its frames visited (cookies, web storage,
+    IndexedDB, service workers, cache storage), the HTTP cache and the
+    permissions are cleared, and its pages are replaced by a fresh one, so no
+    consent state leaks into the next audit. After max_uses audits it is
+    closed and replaced to bound Chromium memory.
+    """
+
+    def __init__(self, browser, size: int = CONTEXT_POOL_SIZE, max_uses: int = CONTEXT_MAX_USES):
+        self.browser = browser
+        self.size = size
+        self.max_uses = max_uses
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=size)
+
+    async def start(self):
+        """Create and warm up all contexts of the pool."""
+        for _ in range(self.size):
+            self._queue.put_nowait(await self._new_context())
+        logging.debug(f"Context pool ready with {self.size} contexts")
+
+    async def _new_context(self) -> PooledContext:
+        context = await self.browser.new_context(
             user_agent=DEFAULT_UA_STRINGS[0],
             viewport={"width": 1366, "height": 768},
             ignore_https_errors=True,
         )
-        logging.debug(f"Context created: {time.time() - start_time:.2f}s")
 
         # Bypass webdriver detection
         await context.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
 
+        page, cdp = await self._new_page(context)
+        return PooledContext(context=context, page=page, cdp=cdp)
+
+    async def _new_page(self, context: BrowserContext) -> Tuple[Page, CDPSession]:
+        """Open a page in context, with resource blocking installed on its CDP session."""
+        # Block unnecessary resources over CDP: it runs browser-side, without a
+        # Python round-trip per request like page.route. Out-of-process iframes
+        # are separate CDP targets and are not covered.
         page = await context.new_page()
-        logging.debug(f"Page created: {time.time() - start_time:.2f}s")
+        cdp = await context.new_cdp_session(page)
+        await cdp.send("Network.enable")
+        await cdp.send("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+        return page, cdp
+
+    async def acquire(self) -> PooledContext:
+        """
+        Wait for a free context and take it out of the pool.
+
+        A slot left empty by a failed replacement (None) gets its context
+        created here; if that fails again, the slot goes back to the pool and
+        the error is raised to the caller.
+        """
+        pooled = await self._queue.get()
+        if pooled is None:
+            try:
+                pooled = await self._new_context()
+            except Exception:
+                self._queue.put_nowait(None)
+                raise
+        return pooled
+
+    async def release(self, pooled: PooledContext):
+        """
+        Reset a context and put it back into the pool.
+
+        Contexts that reached max_uses, or that fail to reset, are closed and
+        replaced by a fresh one. If the replacement cannot be created, an empty
+        slot is queued instead so that the pool keeps its size.
+        """
+        pooled.uses += 1
+        retire = pooled.uses >= self.max_uses
+
+        if not retire:
+            try:
+                # Storage of the audited site and of its third-party frames
+                origins = get_frame_origins(pooled.context)
+                await asyncio.gather(*[
+                    pooled.cdp.send("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+                    for origin in origins
+                ])
+                await pooled.cdp.send("Network.clearBrowserCache")
+                await pooled.context.clear_cookies()
+                await pooled.context.clear_permissions()
+
+                # Fresh page: no in-memory state of the previous site is kept
+                await self._detach_cdp(pooled.cdp)
+                for page in pooled.context.pages:
+                    await page.close()
+                pooled.page, pooled.cdp = await self._new_page(pooled.context)
+            except Exception as e:
+                logging.debug(f"Failed to reset pooled context, replacing it: {e}")
+                retire = True
+
+        if retire:
+            await self._close_context(pooled)
+
+            try:
+                pooled = await self._new_context()
+            except Exception as e:
+                logging.error(f"Failed to create replacement context, retrying on next acquire: {e}")
+                pooled = None
+
+        self._queue.put_nowait(pooled)
+
+    async def close(self):
+        """Close all contexts currently held by the pool."""
+        while not self._queue.empty():
+            pooled = self._queue.get_nowait()
+            if pooled is not None:
+                await self._close_context(pooled)
+
+    async def _detach_cdp(self, cdp: CDPSession):
+        """Drop the listeners of a CDP session and detach it."""
+        cdp.remove_all_listeners()
+        try:
+            await cdp.detach()
+        except Exception as e:
+            logging.debug(f"Error detaching CDP session: {e}")
+
+    async def _close_context(self, pooled: PooledContext):
+        """Detach the CDP session, then close the context."""
+        await self._detach_cdp(pooled.cdp)
+
+        try:
+            await pooled.context.close()
+        except Exception as e:
+            logging.debug(f"Error closing pooled context: {e}")
+
+
+@dataclass
+class BrowserSlot:
+    """A browser owned by a BrowserPool, with its context pool and lease counters."""
+    browser: Browser
+    contexts: ContextPool
+    audits: int = 0
+    active: int = 0
+    replacing: bool = False
+    retired: bool = False
+
+
+class BrowserPool:
+    """
+    Round-robin pool of Chromium instances, each with its own ContextPool.
+
+    A browser is recycled after max_audits leases: its replacement is launched
+    (outside the pool lock, so other leases are not held up) and swapped in
+    first, and the old browser is closed once its in-flight audits have
+    finished, so rotation never interrupts a running audit.
+    """
+
+    def __init__(self, playwright, size: int = BROWSER_POOL_SIZE, max_audits: int = BROWSER_MAX_AUDITS,
+                 contexts_per_browser: int = CONTEXT_POOL_SIZE, **launch_options):
+        self.playwright = playwright
+        self.size = size
+        self.max_audits = max_audits
+        self.contexts_per_browser = contexts_per_browser
+        self.launch_options = launch_options
+        self._slots: List[BrowserSlot] = []
+        self._cycle = itertools.cycle(range(size))
+        self._lock = asyncio.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return len(self._slots) == self.size
+
+    async def start(self):
+        """Launch all browsers of the pool."""
+        for _ in range(self.size):
+            self._slots.append(await self._launch())
+        logging.debug(f"Browser pool ready with {self.size} browsers")
+
+    async def _launch(self) -> BrowserSlot:
+        browser = await self.playwright.chromium.launch(**self.launch_options)
+        contexts = ContextPool(browser, size=self.contexts_per_browser)
+        await contexts.start()
+        return BrowserSlot(browser=browser, contexts=contexts)
+
+    async def _close_slot(self, slot: BrowserSlot):
+        try:
+            await slot.contexts.close()
+            await slot.browser.close()
+        except Exception as e:
+            logging.debug(f"Error closing browser: {e}")
+
+    @asynccontextmanager
+    async def lease(self):
+        """
+        Lease the next browser in round-robin order.
+
+        Yields the ContextPool of the leased browser, to be passed to audit_url.
+        """
+        async with self._lock:
+            index = next(self._cycle)
+            slot = self._slots[index]
+            slot.audits += 1
+            slot.active += 1
+
+            # Only one lease launches the replacement of a given browser
+            replace = slot.audits >= self.max_audits and not slot.replacing
+            if replace:
+                slot.replacing = True
+
+        try:
+            if replace:
+                try:
+                    replacement = await self._launch()
+                except Exception as e:
+                    logging.error(f"Failed to launch replacement browser: {e}")
+                    slot.replacing = False
+                else:
+                    if self.ready:
+                        self._slots[index] = replacement
+                        slot.retired = True
+                        logging.info(f"Browser {index} recycled after {slot.audits} audits")
+                    else:
+                        # Pool closed during the launch
+                        await self._close_slot(replacement)
+
+            yield slot.contexts
+        finally:
+            slot.active -= 1
+            if slot.retired and slot.active == 0:
+                await self._close_slot(slot)
+
+    async def close(self):
+        """Close all browsers of the pool."""
+        slots, self._slots = self._slots, []
+        for slot in slots:
+            await self._close_slot(slot)
+
+
+@functools.lru_cache(maxsize=1)
+def get_consent_wait_selector() -> str:
+    """
+    Build one selector matching any visible known CMP element.
+
+    Combines the first selector of every CMP in consent_managers.yml with
+    CONSENT_HINT_SELECTOR, wrapped in :is(...):visible so that the first
+    match is a visible element (wait_for_selector only checks the first
+    match). The catch-all entries of consent_managers.yml (generic-*,
+    non-specific-*) are skipped: their substring selectors match footer
+    links on most pages. Playwright-only pseudo-classes are left out so one
+    bad entry can't invalidate the whole selector list.
+    """
+    selectors = []
+    for cmp in get_consent_managers():
+        if cmp.get("id", "").startswith(("generic", "non-specific")):
+            continue
+        for action in cmp.get("actions", [])[:1]:
+            values = action["value"] if isinstance(action["value"], list) else [action["value"]]
+            selectors.extend(v for v in values if ":visible" not in v and ":has-text" not in v)
+
+    selectors.append(CONSENT_HINT_SELECTOR)
+    return f":is({', '.join(dict.fromkeys(selectors))}):visible"
+
+
+async def wait_for_consent_hint(page, timeout: int) -> bool:
+    """
+    Wait until a known CMP element is visible.
+
+    Returns as soon as a CMP banner or button is shown. When the wait cannot
+    run (invalid selector, page error), the full timeout is still waited so
+    that late CMPs get the same settle time.
+
+    Args:
+        page: Playwright page
+        timeout: Maximum wait in milliseconds
+
+    Returns:
+        True if a consent element appeared before the timeout
+    """
+    try:
+        await page.wait_for_selector(get_consent_wait_selector(), state="visible", timeout=timeout)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+    except Exception as e:
+        logging.debug("Consent hint wait failed: %s", e)
+        try:
+            await page.wait_for_timeout(timeout)
+        except Exception:
+            pass
+        return False
+
+
+@functools.lru_cache(maxsize=None)
+def get_screenshot_dir() -> str:
+    """Create the screenshot directory on first use and return its path."""
+    os.makedirs(SCREENSHOT_DIR, exist_ok=True)
+    return SCREENSHOT_DIR
+
+
+def write_screenshot(screenshot_path: str, image: bytes) -> str:
+    """Write a captured screenshot to disk and return its path."""
+    Path(screenshot_path).write_bytes(image)
+    return screenshot_path
+
+
+async def save_screenshot(page, filename: str, pending_writes: list):
+    """
+    Capture the viewport as JPEG and write it to the screenshot directory.
 
-        # Capture network requests
-        captured_requests = []
-        page.on("request", lambda req: captured_requests.append(req.url))
+    Only the capture is awaited: the file is written by a background task in a
+    worker thread, appended to pending_writes, so the audit carries on while
+    it is saved. Callers must await pending_writes before they finish; each
+    task returns the path of the written file, or raises if the write failed.
 
-        # Block unnecessary resources to speed up loading
-        await page.route("**/*", lambda route: route.abort() 
-            if route.request.resource_type in ["image", "media", "font"] 
-            else route.continue_())
+    Args:
+        page: Playwright page
+        filename: File name inside SCREENSHOT_DIR
+        pending_writes: List collecting the write tasks
+    """
+    screenshot_path = f"{get_screenshot_dir()}/{filename}"
+    image = await page.screenshot(type="jpeg", quality=SCREENSHOT_JPEG_QUALITY, full_page=False)
+    pending_writes.append(asyncio.create_task(asyncio.to_thread(write_screenshot, screenshot_path, image)))
+    logging.debug("Screenshot captured: %s", screenshot_path)
+
+
+async def audit_url(url: str, context_pool: ContextPool, config: AuditConfig, screenshot: bool = False) -> AuditResult:
+    """
+    Complete audit pipeline for a single URL.
+
+    The browser context is leased from context_pool for the duration of the
+    audit and always handed back, including on error or cancellation.
+
+    When the PROFILE environment variable is set and pyinstrument is
+    installed, each audit is profiled and an HTML report is written to the
+    temp directory as audit-<domain>-<url hash>-<pid>-<timestamp>.html, unique
+    across concurrent and repeated audits.
+    """
+    if not os.getenv("PROFILE"):
+        return await _audit_url(url, context_pool, config, screenshot)
+
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        logging.warning("PROFILE is set but pyinstrument is not installed")
+        return await _audit_url(url, context_pool, config, screenshot)
+
+    profiler = Profiler(async_mode="enabled")
+    with profiler:
+        audit_result = await _audit_url(url, context_pool, config, screenshot)
+
+    report_name = (
+        f"audit-{_SAFE_FNAME_RE.sub('_', audit_result.domain_name)}"
+        f"-{hashlib.sha1(url.encode()).hexdigest()[:8]}-{os.getpid()}-{time.time_ns()}.html"
+    )
+    report_path = os.path.join(tempfile.gettempdir(), report_name)
+    Path(report_path).write_text(profiler.output_html(), encoding="utf-8")
+    logging.info("Profile written to %s", report_path)
+    return audit_result
+
+
+async def _audit_url(url: str, context_pool: ContextPool, config: AuditConfig, screenshot: bool) -> AuditResult:
+    # Create audit result with default values
+    audit_result = create_audit_result(url)
+    domain_name = audit_result.domain_name
+
+    start_time = time.time()
+    pooled = None
+    on_request = None
+    screenshot_writes = []
+
+    try:
+        pooled = await context_pool.acquire()
+        context = pooled.context
+        logging.debug("Context acquired: %.2fs", time.time() - start_time)
+
+        page = pooled.page
+
+        # Capture the hosts of network requests; keeping only unique hosts
+        # bounds memory on request-heavy sites. Playwright's request event is
+        # used rather than the page's CDP session: it also reports the
+        # requests of out-of-process iframes (CMPs, ad frames), which are
+        # separate CDP targets
+        request_hosts = set()
+        on_request = lambda request: request_hosts.add(get_request_host(request.url))
+        page.on("request", on_request)
 
         # Navigate to URL
         logging.info(f"Auditing: {url}")
         try:
             # wait_until="domcontentloaded" is much faster than "load"
-            # Reduced timeout to 15s to fail fast on slow sites (like BBC)
+            # PAGE_LOAD_TIMEOUT (15s) to fail fast on slow sites (like BBC)
             # Often the banner is already there even if the page isn't fully loaded
             t0 = time.time()
-            await page.goto(url, wait_until="domcontentloaded", timeout=15000)
-            logging.debug(f"Page loaded: {time.time() - t0:.2f}s")
+            await page.goto(url, wait_until="domcontentloaded", timeout=PAGE_LOAD_TIMEOUT)
+            logging.debug("Page loaded: %.2fs", time.time() - t0)
         except PlaywrightTimeoutError:
-            logging.warning(f"Page load timeout (15s) for {url} - proceeding anyway to check for banner")
+            logging.warning(f"Page load timeout ({PAGE_LOAD_TIMEOUT / 1000:.0f}s) for {url} - proceeding anyway to check for banner")
             # Do NOT return error, continue to see if banner is visible
             pass
         except Exception as e:
             logging.warning(f"Page load error for {url}: {e}")
             audit_result.status = "error"
             audit_result.status_msg = f"Page load error: {str(e)}"
-            await context.close()
             return audit_result
 
-        # Simulate mouse movement (helps trigger lazy-loaded CMPs)
-        try:
-            await page.mouse.move(100, 100)
-            await page.mouse.move(200, 200)
-        except:
-            pass
-
-        # Wait for JS execution and CMP loading (increased for slow CMPs like Orejime)
-        await page.wait_for_timeout(3000)
+        # Wait for a CMP to render instead of sleeping a fixed delay
+        wait_start = time.monotonic()
+        if not await wait_for_consent_hint(page, min(config.timeout_banner, BANNER_APPEAR_TIMEOUT)):
+            # Simulate mouse movement (helps trigger lazy-loaded CMPs)
+            try:
+                await page.mouse.move(100, 100)
+                await page.mouse.move(200, 200)
+            except:
+                pass
+            await wait_for_consent_hint(page, PAGE_READY_WAIT)
+
+        # Floor delay even when a CMP showed up at once: its buttons and
+        # second-layer content often render after the container
+        remaining = PAGE_READY_WAIT - (time.monotonic() - wait_start) * 1000
+        if remaining > 0:
+            await page.wait_for_timeout(remaining)
+        logging.debug("CMP wait finished: %.2fs", time.time() - start_time)
 
         # Get CMP configurations
         cmp_configs = get_consent_managers()
 
         # Detect banner
-        logging.debug(f"Starting banner detection: {time.time() - start_time:.2f}s")
+        logging.debug("Starting banner detection: %.2fs", time.time() - start_time)
         t0 = time.time()
         banner_info = await detect_banner(page, cmp_configs, config)
-        logging.debug(f"Banner detection finished: {time.time() - t0:.2f}s")
+        logging.debug("Banner detection finished: %.2fs", time.time() - t0)
         
         if banner_info:
             audit_result.banner_info = banner_info
         # Take screenshot if requested
         if screenshot:
-            screenshot_dir = "screenshots"
-            if not os.path.exists(screenshot_dir):
-                os.makedirs(screenshot_dir)
-
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            screenshot_path = f"{screenshot_dir}/{domain_name}_{timestamp}_banner.png"
-            await page.screenshot(path=screenshot_path, full_page=False)
-            audit_result.screenshot_files.append(screenshot_path)
-            logging.debug(f"Screenshot saved: {screenshot_path}")
+            screenshot_prefix = f"{domain_name}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            await save_screenshot(page, f"{screenshot_prefix}_banner.jpg", screenshot_writes)
 
         # HYBRID APPROACH: Passive extraction is guaranteed success
         # Banner detected + buttons extracted = success_basic (guaranteed)
@@ -159,8 +603,6 @@ async def audit_url(url: str, browser, config: AuditConfig, screenshot: bool = F
         if (settings_button or banner_info.cmp_type) and config.max_ui_depth > 0:
             logging.debug("Attempting detailed extraction via UI navigation...")
             try:
-                from consentcrawl.ui_explorer import attempt_detailed_extraction
-
                 detailed_data = await attempt_detailed_extraction(page, banner_info, config)
 
                 if detailed_data:
@@ -179,9 +621,7 @@ async def audit_url(url: str, browser, config: AuditConfig, screenshot: bool = F
 
                     # Take screenshot after UI exploration
                     if screenshot:
-                        screenshot_path = f"{screenshot_dir}/{domain_name}_{timestamp}_ui.png"
-                        await page.screenshot(path=screenshot_path, full_page=False)
-                        audit_result.screenshot_files.append(screenshot_path)
+                        await save_screenshot(page, f"{screenshot_prefix}_ui.jpg", screenshot_writes)
                 else:
                     # Detailed extraction failed - keep success_basic
                     logging.debug("Detailed extraction returned None (acceptable in hybrid mode)")
@@ -189,17 +629,16 @@ async def audit_url(url: str, browser, config: AuditConfig, screenshot: bool = F
 
             except Exception as e:
                 # Exception during detailed extraction - keep success_basic
-                logging.debug(f"Detailed extraction failed (acceptable in hybrid mode): {e}")
+                logging.debug("Detailed extraction failed (acceptable in hybrid mode): %s", e)
                 audit_result.ui_context.errors.append(f"Detailed extraction failed: {str(e)[:100]}")
                 # Status remains success_basic
         else:
             logging.debug("No settings button found, skipping detailed extraction")
 
         # Process captured requests using utility function
-        from consentcrawl.utils import process_network_requests
-        
+        request_hosts.discard(None)
         audit_result.third_party_domains, audit_result.tracking_domains = process_network_requests(
-            captured_requests, domain_name, TRACKING_DOMAINS
+            request_hosts, domain_name, TRACKING_DOMAINS
         )
 
         # Extract actual cookies from browser context
@@ -210,148 +649,329 @@ async def audit_url(url: str, browser, config: AuditConfig, screenshot: bool = F
         except Exception as e:
             logging.warning(f"Failed to extract actual cookies: {e}")
 
-        # Close context
-        await context.close()
-
     except Exception as e:
         logging.error(f"Error auditing {url}: {e}")
         audit_result.status = "error"
         audit_result.status_msg = f"Error: {str(e)}"
 
+    finally:
+        if pooled is not None:
+            if on_request is not None:
+                pooled.page.remove_listener("request", on_request)
+            await context_pool.release(pooled)
+
+    # Wait for screenshot files still being written; only the files actually
+    # on disk are reported
+    for write_result in await asyncio.gather(*screenshot_writes, return_exceptions=True):
+        if isinstance(write_result, Exception):
+            logging.warning(f"Failed to save screenshot: {write_result}")
+        else:
+            audit_result.screenshot_files.append(write_result)
+
     return audit_result
 
 
-async def audit_batch(urls: list, batch_size: int = 10, config: AuditConfig = None,
+async def audit_batch(urls: Sequence[str], batch_size: int = 10, config: AuditConfig = None,
                       headless: bool = True, results_db_file: str = "audit_results.db",
-                      output_dir: str = "./audit_results", screenshot: bool = False) -> list:
+                      output_dir: str = "./audit_results", screenshot: bool = False,
+                      collect_results: bool = True) -> list:
     """
-    Audit a batch of URLs in parallel.
+    Audit a list of URLs with a fixed number of concurrent workers.
 
-    Uses the same batching pattern as crawl_batch().
+    URLs are fed through a bounded queue to batch_size workers sharing one
+    browser, so a slow site only holds up its own worker. Finished results go
+    through a second queue to a single writer that stores them in SQLite, as
+    individual JSON files and as lines of audit_results.jsonl in output_dir.
 
     Args:
-        urls: List of URLs to audit
+        urls: URLs to audit (list or tuple)
         batch_size: Number of parallel browser windows
         config: Audit configuration
         headless: Run browser in headless mode
         results_db_file: SQLite database file path
         output_dir: Directory for JSON output files
         screenshot: Whether to capture screenshots
+        collect_results: Keep every result in memory to return it. Disable for
+            large runs and read audit_results.jsonl instead.
 
     Returns:
-        List of audit result dictionaries
+        List of audit result dictionaries (empty if collect_results is False)
     """
     if config is None:
         config = AuditConfig()
 
     # Create output directory if it doesn't exist
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    if screenshot:
+        get_screenshot_dir()
 
     all_results = []
+    status_counts = collections.Counter()
+    url_queue: asyncio.Queue = asyncio.Queue(maxsize=batch_size * 4)
+    result_queue: asyncio.Queue = asyncio.Queue(maxsize=batch_size * 2)
+
+    async def feed():
+        for url in urls:
+            await url_queue.put(url)
+        for _ in range(batch_size):
+            await url_queue.put(None)
+
+    async def work(browser_pool: BrowserPool):
+        while True:
+            url = await url_queue.get()
+            try:
+                if url is None:
+                    return
+                async with browser_pool.lease() as context_pool:
+                    result = await audit_url(url, context_pool, config, screenshot)
+                await result_queue.put(result)
+            except Exception as e:
+                logging.error(f"Worker failed to audit {url}: {e}")
+                await result_queue.put(create_audit_result(url, status="error"))
+            finally:
+                url_queue.task_done()
+
+    async def collect() -> list:
+        # Gather results arriving within WRITER_FLUSH_INTERVAL of the first
+        # one (up to WRITER_MAX_BATCH) so they share a single commit
+        results = [await result_queue.get()]
+        deadline = time.monotonic() + WRITER_FLUSH_INTERVAL
+        while results[-1] is not None and len(results) < WRITER_MAX_BATCH:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                results.append(await asyncio.wait_for(result_queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return results
+
+    async def write():
+        while True:
+            results = await collect()
+
+            done = results[-1] is None
+            results = [r for r in results if r is not None]
+
+            # Convert each result once, then reuse the dict for every output
+            records = [result.to_dict() for result in results]
+
+            # Store in SQLite with one commit for everything finished so far,
+            # and the JSON files alongside, all off the event loop so the
+            # workers keep driving their pages meanwhile
+            await asyncio.gather(
+                asyncio.to_thread(store_audit_results_batch, records, results_db_file),
+                store_json_results(records, output_path),
+                asyncio.to_thread(append_jsonl, records),
+            )
 
-    for url_batch in utils.batch(urls, batch_size):
-        logging.info(f"Processing batch of {len(url_batch)} URLs")
+            # Add to results list
+            if collect_results:
+                all_results.extend(records)
+            status_counts.update(record["status"] for record in records)
 
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(
-                headless=headless
-            )
+            if results:
+                logging.info(f"{sum(status_counts.values())}/{len(urls)} URLs processed")
 
-            # Process URLs in parallel within the batch
-            batch_results = await asyncio.gather(*[
-                audit_url(url, browser, config, screenshot)
-                for url in url_batch
-            ])
+            if done:
+                return
 
-            await browser.close()
+    def append_jsonl(records: list):
+        try:
+            jsonl_file.write(b"".join(
+                orjson.dumps(record, option=orjson.OPT_NON_STR_KEYS) + b"\n" for record in records
+            ))
+            jsonl_file.flush()
+        except Exception as e:
+            logging.error(f"Error appending audit results to audit_results.jsonl: {e}")
 
-            # Store results
-            for result in batch_results:
-                # Store in SQLite
-                store_audit_results(result, results_db_file=results_db_file)
+    with open(output_path / "audit_results.jsonl", "ab") as jsonl_file:
+        async with async_playwright() as p:
+            browser_pool = BrowserPool(p, size=1, contexts_per_browser=batch_size, headless=headless)
+            await browser_pool.start()
 
-                # Store in JSON file
-                store_json_result(result, output_dir)
+            writer = asyncio.create_task(write())
+            workers = asyncio.ensure_future(
+                asyncio.gather(feed(), *[work(browser_pool) for _ in range(batch_size)])
+            )
+            try:
+                await asyncio.wait({writer, workers}, return_when=asyncio.FIRST_COMPLETED)
+                if writer.done():
+                    # The writer only returns after the final None below, so
+                    # it failed: nothing drains result_queue any more and the
+                    # workers would block on put forever
+                    logging.error("Result writer failed, stopping the batch")
+                    writer.result()
+                    raise RuntimeError("Result writer stopped before the end of the batch")
+                workers.result()
+            finally:
+                if not workers.done():
+                    workers.cancel()
+                    await asyncio.gather(workers, return_exceptions=True)
+                if not writer.done():
+                    await result_queue.put(None)
+                    await writer
+                await browser_pool.close()
+
+    logging.info(f"All URLs complete. Total: {sum(status_counts.values())} URLs audited ({dict(status_counts)}).")
+    return all_results
 
-                # Add to results list
-                all_results.append(result.to_dict())
 
-        logging.info(f"Batch complete. {len(batch_results)} URLs processed.")
+_AUDIT_SCHEMA = get_audit_schema()
+_AUDIT_COLUMNS = list(_AUDIT_SCHEMA)
+_CREATE_AUDIT_TABLE_SQL = (
+    "CREATE TABLE IF NOT EXISTS audit_results ("
+    + ", ".join(f"{k} {v}" for k, v in _AUDIT_SCHEMA.items())
+    + ")"
+)
+_INSERT_AUDIT_SQL = (
+    f"INSERT INTO audit_results ({', '.join(_AUDIT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in _AUDIT_COLUMNS)}) "
+    f"ON CONFLICT(id) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in _AUDIT_COLUMNS if c != "id")
+)
 
-    logging.info(f"All batches complete. Total: {len(all_results)} URLs audited.")
-    return all_results
+_db_connections = {}
+_db_lock = threading.Lock()
 
 
-def store_audit_results(audit_result: AuditResult, results_db_file: str = "audit_results.db"):
+def get_results_connection(results_db_file: str = "audit_results.db") -> sqlite3.Connection:
     """
-    Store audit result in SQLite database.
+    Return the long-lived connection to the audit results database.
 
-    Creates table if it doesn't exist. JSON-serializes complex fields.
+    The connection is opened once per database file in WAL mode and the
+    audit_results table is created on first use. Callers must hold _db_lock.
 
     Args:
-        audit_result: AuditResult object to store
         results_db_file: SQLite database file path
+
+    Returns:
+        sqlite3.Connection shared by all writers of this file
+    """
+    conn = _db_connections.get(results_db_file)
+    if conn is not None:
+        return conn
+
+    conn = sqlite3.connect(results_db_file, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")  # 64 MiB page cache
+
+    conn.execute(_CREATE_AUDIT_TABLE_SQL)
+    ensure_unique_audit_ids(conn)
+    conn.commit()
+
+    _db_connections[results_db_file] = conn
+    return conn
+
+
+def ensure_unique_audit_ids(conn: sqlite3.Connection):
+    """
+    Make sure audit_results has a unique index on id, as the upsert needs.
+
+    Tables created before id became the primary key have no such index and
+    may hold several rows per id. The most recent row of each id is kept in
+    audit_results; the older ones are moved to audit_results_duplicates
+    rather than dropped.
     """
     try:
-        conn = sqlite3.connect(results_db_file)
-        c = conn.cursor()
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS audit_results_id ON audit_results (id)")
+    except sqlite3.IntegrityError:
+        stale = "rowid NOT IN (SELECT MAX(rowid) FROM audit_results GROUP BY id)"
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS audit_results_duplicates AS SELECT * FROM audit_results WHERE 0")
+            moved = conn.execute(f"INSERT INTO audit_results_duplicates SELECT * FROM audit_results WHERE {stale}").rowcount
+            conn.execute(f"DELETE FROM audit_results WHERE {stale}")
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS audit_results_id ON audit_results (id)")
+        logging.warning(
+            f"Moved {moved} duplicate audit results to audit_results_duplicates before indexing ids"
+        )
 
-        # Create table if not exists
-        from consentcrawl.audit_schemas import get_audit_schema
 
-        schema = get_audit_schema()
-        schema_sql = ", ".join([f"{k} {v}" for k, v in schema.items()])
-        c.execute(f"CREATE TABLE IF NOT EXISTS audit_results ({schema_sql})")
+def store_audit_results_batch(audit_results: List[Dict[str, Any]], results_db_file: str = "audit_results.db"):
+    """
+    Store several audit results in SQLite with a single transaction.
 
-        # Prepare data for insertion
-        data = audit_result.to_dict()
+    JSON-serializes complex fields.
 
+    Args:
+        audit_results: Audit results as returned by AuditResult.to_dict()
+        results_db_file: SQLite database file path
+    """
+    if not audit_results:
+        return
+
+    try:
         # JSON serialize complex types
-        data_serialized = {}
-        for k, v in data.items():
-            if isinstance(v, (dict, list)):
-                data_serialized[k] = json.dumps(v)
-            else:
-                data_serialized[k] = v
+        rows = [
+            [
+                orjson.dumps(v, option=orjson.OPT_NON_STR_KEYS).decode("utf-8") if isinstance(v, (dict, list)) else v
+                for v in (data[column] for column in _AUDIT_COLUMNS)
+            ]
+            for data in audit_results
+        ]
+
+        # Insert, or update the existing row of the same domain
+        with _db_lock:
+            conn = get_results_connection(results_db_file)
+            conn.executemany(_INSERT_AUDIT_SQL, rows)
+            conn.commit()
+
+        logging.debug("Stored %d audit results in database", len(rows))
 
-        # Insert or replace
-        columns = ", ".join(data_serialized.keys())
-        placeholders = ", ".join(["?" for _ in data_serialized])
-        sql = f"INSERT OR REPLACE INTO audit_results ({columns}) VALUES ({placeholders})"
+    except Exception as e:
+        logging.error(f"Error storing audit results in database: {e}")
 
-        c.execute(sql, list(data_serialized.values()))
-        conn.commit()
-        conn.close()
 
-        logging.debug(f"Stored audit result in database: {audit_result.url}")
+def store_audit_results(audit_result: AuditResult, results_db_file: str = "audit_results.db"):
+    """
+    Store audit result in SQLite database.
 
-    except Exception as e:
-        logging.error(f"Error storing audit result in database: {e}")
+    Args:
+        audit_result: AuditResult object to store
+        results_db_file: SQLite database file path
+    """
+    store_audit_results_batch([audit_result.to_dict()], results_db_file=results_db_file)
 
 
-def store_json_result(audit_result: AuditResult, output_dir: str):
+async def store_json_result(audit_data: Dict[str, Any], output_dir: Union[str, Path]):
     """
     Store audit result as individual JSON file.
 
     Args:
-        audit_result: AuditResult object to store
+        audit_data: Audit result as returned by AuditResult.to_dict()
         output_dir: Directory for JSON files
     """
-    try:
-        # Create safe filename from domain
-        safe_domain = re.sub(r'[^a-zA-Z0-9_-]', '_', audit_result.domain_name)
-        filename = f"{safe_domain}.json"
-        filepath = os.path.join(output_dir, filename)
+    await store_json_results([audit_data], output_dir)
+
 
-        # Write JSON file
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(audit_result.to_dict(), f, indent=2, ensure_ascii=False)
+async def store_json_results(audit_results: List[Dict[str, Any]], output_dir: Union[str, Path]):
+    """
+    Store several audit results as individual JSON files.
 
-        logging.debug(f"Saved JSON result: {filepath}")
+    All files are encoded and written in a single worker-thread hop, which is
+    cheaper than one hop per file when many small results finish together.
 
-    except Exception as e:
-        logging.error(f"Error saving JSON result: {e}")
+    Args:
+        audit_results: Audit results as returned by AuditResult.to_dict()
+        output_dir: Directory for JSON files
+    """
+    output_dir = Path(output_dir)
+
+    def write_all():
+        for audit_data in audit_results:
+            try:
+                safe_domain = _SAFE_FNAME_RE.sub('_', audit_data["domain_name"])
+                filepath = output_dir / f"{safe_domain}.json"
+                payload = orjson.dumps(audit_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+                filepath.write_bytes(payload)
+                logging.debug("Saved JSON result: %s", filepath)
+            except Exception as e:
+                logging.error(f"Error saving JSON result: {e}")
+
+    await asyncio.to_thread(write_all)
 
 
 def create_audit_result(url: str, status: str = "pending") -> AuditResult:
@@ -365,8 +985,17 @@ def create_audit_result(url: str, status: str = "pending") -> AuditResult:
     Returns:
         AuditResult object
     """
-    domain_name = re.search(r"^(?:https?://)?(?:www\.)?([^/]+)", url).group(1) if url else "unknown"
-    result_id = base64.b64encode(domain_name.encode()).decode("utf-8")
+    # The id keeps its historical input (URL host as written, port included)
+    # so that results stored before stay addressable
+    match = _DOMAIN_RE.search(url) if url else None
+    id_source = match.group(1) if match else "unknown"
+    result_id = b2a_base64(id_source.encode(), newline=False).decode("ascii")
+
+    try:
+        domain_name = (get_request_host(url if "://" in url else f"http://{url}") if url else None) or id_source
+    except ValueError as e:
+        logging.debug(f"Could not parse host of {url}: {e}")
+        domain_name = id_source
 
     return AuditResult(
         id=result_id,
@@ -12,7 +12,7 @@ from datetime import datetime
 from enum import Enum
 
 
-@dataclass
+@dataclass(slots=True)
 class AuditConfig:
     """Configuration for audit mode behavior."""
     max_ui_depth: int = 3    # Reverted to 3 for detailed extraction
@@ -35,7 +35,7 @@ class AuditConfig:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ButtonInfo:
     """Information about a button in the consent UI."""
     text: str
@@ -54,7 +54,7 @@ class ButtonInfo:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class BannerInfo:
     """Information about detected consent banner."""
     detected: bool
@@ -82,7 +82,7 @@ class BannerInfo:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class CategoryInfo:
     """Consent category information."""
     name: str
@@ -103,7 +103,7 @@ class CategoryInfo:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class VendorInfo:
     """Vendor/partner information."""
     name: str
@@ -124,7 +124,7 @@ class VendorInfo:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class CookieDetail:
     """Individual cookie details from UI."""
     name: str
@@ -176,7 +176,7 @@ class DiscoveryMethod(Enum):
 
 # Dataclasses for Phase 2 - Section Discovery
 
-@dataclass
+@dataclass(slots=True)
 class DiscoveredSection:
     """A section discovered within a CMP modal."""
     section_type: SectionType
@@ -209,7 +209,7 @@ class DiscoveredSection:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class SectionDiscoveryResult:
     """Result of section discovery process."""
     sections: List[DiscoveredSection]
@@ -232,7 +232,7 @@ class SectionDiscoveryResult:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ConsentUIContext:
     """State tracking during UI exploration."""
     current_depth: int = 0
@@ -249,7 +249,7 @@ class ConsentUIContext:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class AuditResult:
     """Complete audit result for one URL."""
     id: str
@@ -300,7 +300,7 @@ def get_audit_schema() -> Dict[str, str]:
     All complex types (dicts, lists) are stored as JSON-serialized TEXT fields.
     """
     return {
-        "id": "STRING",
+        "id": "TEXT PRIMARY KEY",  # One row per domain, upserted on re-audit
         "url": "STRING",
         "domain_name": "STRING",
         "extraction_datetime": "STRING",
@@ -12,11 +12,13 @@ Designed to detect 35+ CMP types plus custom implementations.
 """
 
 import asyncio
+import functools
 import logging
 import os
+import re
 import yaml
-from typing import Optional, Tuple, List
-from playwright.async_api import Page, Locator, Frame, TimeoutError as PlaywrightTimeoutError
+from typing import Callable, Optional, Tuple, List, Union
+from playwright.async_api import Page, Locator, Frame, FrameLocator
 
 from consentcrawl.audit_schemas import BannerInfo, ButtonInfo, AuditConfig
 from consentcrawl.cmp_detectors import (
@@ -28,19 +30,556 @@ from consentcrawl.cmp_detectors import (
     detect_sfbx_modal,
     detect_lemonde_wall
 )
+from consentcrawl.constants import (
+    BANNER_TEXT_EXPAND_THRESHOLD,
+    IFRAME_SEARCH_CONCURRENCY,
+    MAX_BANNER_BUTTONS,
+)
+from consentcrawl.utils import YAML_LOADER
 
 
 MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
 AUDIT_SELECTORS_FILE = f"{MODULE_DIR}/assets/audit_selectors.yml"
 
+_JS_REGEX_SPECIAL = re.compile(r"[.*+?^${}()|\[\]\\/]")
+
+# clean_text patterns
+_BLOCK_TAG_RE = re.compile(r'<(?:br|div|p|h\d|li|tr)[^>]*>|</(?:div|p|h\d|li|tr)>', re.IGNORECASE)
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_CSS_BLOCK_RE = re.compile(r'{[^}]+}')
+# Whitespace runs other than newlines
+_INLINE_WHITESPACE_RE = re.compile(r'[^\S\n]+')
+
+# Button text patterns per role, in classification priority order
+BUTTON_ROLE_PATTERNS = (
+    ("accept_all", (
+        "accept all", "accept", "agree", "allow all", "allow",
+        "accepter tout", "accepter", "j'accepte", "tout accepter",
+        "akzeptieren", "alle akzeptieren", "aceptar",
+    )),
+    ("reject_all", (
+        "reject all", "reject", "refuse", "deny",
+        "refuser tout", "refuser", "tout refuser",
+        "ablehnen", "alles ablehnen", "rechazar",
+    )),
+    ("settings", (
+        "setting", "manage", "customize", "configure", "preference", "choice", "choose", "option",
+        "paramétrer", "gérer", "personnaliser", "configurer", "préférence",
+        "einstellung", "verwalten", "anpassen",
+        "configurar", "gestionar", "set up", "partners", "partenaires",
+    )),
+    ("info", (
+        "more info", "learn more", "privacy policy", "cookie policy", "details",
+        "plus d'info", "en savoir plus", "politique",
+        "mehr erfahren", "datenschutz",
+        "más información", "política",
+    )),
+)
+
+# Words that keep an accept button from being accept_all ("accept necessary")
+_ACCEPT_ALL_EXCLUSIONS = ("necessary", "essential")
+
+# Python detectors for CMPs whose logic is not expressible in YAML, in
+# priority order
+_HARDCODED_DETECTORS: Tuple[Tuple[str, Callable], ...] = (
+    ("sourcepoint", detect_sourcepoint_modal),
+    ("onetrust", detect_onetrust_modal),
+    ("didomi", detect_didomi_modal),
+    ("orejime", detect_orejime_modal),
+    ("trust_commander", detect_trust_commander_modal),
+    ("sfbx", detect_sfbx_modal),
+    ("lemonde", detect_lemonde_wall),
+)
+
+# Lowercase strings whose presence in the page HTML or in a frame URL/name
+# tells that a hardcoded detector may match; detectors without any of their
+# markers are skipped
+_HARDCODED_DETECTOR_MARKERS = {
+    "sourcepoint": ["sp_message", "sourcepoint", "sp-prod.net", "privacy-mgmt"],
+    "onetrust": ["onetrust", "optanon", "cookielaw", "ot-sdk", "ot-pc"],
+    "didomi": ["didomi"],
+    "orejime": ["orejime"],
+    "trust_commander": ["tc_privacy", "tc-privacy", "privacy-center", "privacy-iframe", "tagcommander", "commandersact"],
+    "sfbx": ["appconsent", "sfbx"],
+    "lemonde": ["gdpr-lmd"],
+}
+
+# Buttons of the hardcoded CMPs: (role, label, selectors tried in order)
+_HARDCODED_CMP_BUTTONS = {
+    "lemonde": [
+        ("accept_all", "Accéder gratuitement", ["button[data-gdpr-expression='acceptAll']"]),
+        # Effectively rejecting consent by paying
+        ("reject_all", "S'abonner", [".js-gdpr-deny-subscribe"]),
+    ],
+    "onetrust": [
+        ("accept_all", "Accept", [
+            "#onetrust-accept-btn-handler",
+            "#accept-recommended-btn-handler",
+            ".save-preference-btn-handler",  # Often "Save & Exit" acts as accept if all selected or default
+        ]),
+        ("reject_all", "Reject", ["#onetrust-reject-all-handler", ".ot-pc-refuse-all-handler"]),
+        ("settings", "Manage", ["#onetrust-pc-btn-handler"]),
+    ],
+    "trust_commander": [
+        ("accept_all", "Accepter", [
+            "#footer_tc_privacy_button_2",  # Cdiscount specific
+            "#popin_tc_privacy_button_2",  # Credit Agricole specific
+            "[title='Accepter']",
+            "[title='Accepter et fermer']",
+            "button:has-text('Accepter'):not(:has-text('sans'))",  # Avoid "Continuer sans accepter"
+        ]),
+        ("reject_all", "Continuer sans accepter", [
+            "#footer_tc_privacy_button_3",  # Cdiscount specific
+            "#popin_tc_privacy_button_3",  # Credit Agricole specific
+            "[title='Continuer sans accepter']",
+            "button:has-text('Continuer sans accepter')",
+        ]),
+        ("settings", "Paramétrer", [
+            "#footer_tc_privacy_button",  # Cdiscount specific
+            "#popin_tc_privacy_button",  # Credit Agricole specific
+            "[title='Paramétrer les cookies']",
+            "[title='Personnaliser mes choix']",
+            "button:has-text('Paramétrer')",
+            "button:has-text('Personnaliser')",
+        ]),
+    ],
+    "orejime": [
+        ("accept_all", "Accepter", [".orejime-Button--save"]),
+        ("reject_all", "Refuser", [".orejime-Button--decline"]),
+        ("settings", "Personnaliser", [".orejime-Button--info"]),
+    ],
+}
+
+# CMPs whose buttons are reported when present, even if not visible (the
+# Orejime notice can be detected while hidden)
+_HARDCODED_CMP_BUTTONS_PRESENCE_ONLY = {"lemonde", "orejime"}
+
+_HAS_TEXT_RE = re.compile(r":has-text\('([^']*)'\)")
+_NOT_HAS_TEXT_RE = re.compile(r":not\(:has-text\('([^']*)'\)\)")
+
+
+# Containers that usually hold a consent banner, in priority order
+# (plain CSS: they are matched with querySelectorAll inside the page)
+GENERIC_BANNER_SELECTORS = [
+    "[role='dialog']",
+    "[aria-modal='true']",
+    ".modal.show",
+    ".modal[style*='display: block']",
+    ".popup[style*='display: block']",
+    "[class*='cookie'][class*='banner']",
+    "[class*='consent'][class*='banner']",
+    "[id*='cookie'][id*='banner']",
+    "[id*='consent'][id*='banner']",
+]
+
+GENERIC_BANNER_KEYWORDS = ["cookie", "consent", "privacy", "données", "confidentialité"]
+
+# Attribute set on the element found by an in-page detection script, so a
+# Locator can be built for it afterwards
+BANNER_MARKER_ATTRIBUTE = "data-consentcrawl-banner"
+
+# Consent keywords looked for in the text of candidate banner containers by
+# the container climbing scripts
+CONSENT_KEYWORDS_RE_JS = "/cookie|consent|privacy|confidentialité|données|paramètre/i"
+
+# Builds a CSS selector for an element found by an in-page script: #id when
+# the id is unique, otherwise a tag:nth-child(n) path from the closest
+# identifiable ancestor (null inside shadow DOM)
+UNIQUE_SELECTOR_JS = """const uniqueSelector = (el) => {
+        const parts = [];
+        for (let node = el; node && node.nodeType === 1; node = node.parentElement) {
+            if (node.id) {
+                const idSelector = '#' + CSS.escape(node.id);
+                if (document.querySelectorAll(idSelector).length === 1) {
+                    parts.unshift(idSelector);
+                    return parts.join(' > ');
+                }
+            }
+            if (node === document.documentElement) {
+                parts.unshift('html');
+                return parts.join(' > ');
+            }
+            // Shadow DOM: no CSS path from the document
+            if (!node.parentElement) return null;
+            const index = Array.prototype.indexOf.call(node.parentElement.children, node) + 1;
+            parts.unshift(`${node.tagName.toLowerCase()}:nth-child(${index})`);
+        }
+        return null;
+    };"""
+
+# Visibility check shared by the in-page detection scripts, used instead of
+# Playwright's :visible pseudo-class: the layout box is read first, styles only
+# for elements that have one
+IS_VISIBLE_JS = """const isVisible = (el) => {
+        const rects = el.getClientRects();
+        if (rects.length === 0 || rects[0].width === 0 || rects[0].height === 0) return false;
+        const style = window.getComputedStyle(el);
+        return style.visibility !== 'hidden' && style.display !== 'none';
+    };"""
+
+# querySelector(All) that also looks into open shadow roots, as Playwright's
+# CSS engine does. Shadow roots are collected once per script run, on first
+# use (the whole DOM is walked)
+QUERY_DEEP_JS = """let shadowRootsCache = null;
+    const shadowRoots = () => {
+        if (shadowRootsCache === null) {
+            shadowRootsCache = [];
+            const collect = (root) => {
+                const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT);
+                for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+                    if (node.shadowRoot) {
+                        shadowRootsCache.push(node.shadowRoot);
+                        collect(node.shadowRoot);
+                    }
+                }
+            };
+            collect(document);
+        }
+        return shadowRootsCache;
+    };
+    const queryAllDeep = (css) => {
+        const found = Array.from(document.querySelectorAll(css));
+        for (const root of shadowRoots()) found.push(...root.querySelectorAll(css));
+        return found;
+    };
+    const queryDeep = (css) => {
+        const el = document.querySelector(css);
+        if (el) return el;
+        for (const root of shadowRoots()) {
+            const found = root.querySelector(css);
+            if (found) return found;
+        }
+        return null;
+    };"""
+
+FIND_GENERIC_BANNER_JS = """
+([selectors, keywords]) => {
+    """ + QUERY_DEEP_JS + """
+
+    const marker = '""" + BANNER_MARKER_ATTRIBUTE + """';
+    queryAllDeep('[' + marker + ']').forEach(el => el.removeAttribute(marker));
+
+    """ + IS_VISIBLE_JS + """
+
+    // One traversal for all selectors, open shadow roots included (banners
+    // rendered in a web component); candidates come back in document order,
+    // shadow roots last, so keep the one matching the highest-priority selector
+    let best = null;
+    let bestRank = selectors.length;
+    for (const el of queryAllDeep(selectors.join(', '))) {
+        const rank = selectors.findIndex(selector => el.matches(selector));
+        if (rank < 0 || rank >= bestRank || !isVisible(el)) continue;
+        const text = (el.innerText || '').toLowerCase();
+        if (keywords.some(keyword => text.includes(keyword))) {
+            best = el;
+            bestRank = rank;
+            if (rank === 0) break;
+        }
+    }
+
+    if (!best) return null;
+    best.setAttribute(marker, '');
+    return selectors[bestRank];
+}
+"""
+
+
+FIND_TEXT_BANNER_JS = """
+(pattern) => {
+    const marker = '""" + BANNER_MARKER_ATTRIBUTE + """';
+    document.querySelectorAll('[' + marker + ']').forEach(el => el.removeAttribute(marker));
+
+    const re = new RegExp(pattern, 'i');
+    """ + IS_VISIBLE_JS + """
+    // First fixed/sticky or high z-index parent holding links or buttons
+    const findContainer = (el) => {
+        let current = el;
+        while (current && current !== document.body) {
+            const style = window.getComputedStyle(current);
+            const zIndex = parseInt(style.zIndex) || 0;
+            if ((style.position === 'fixed' || style.position === 'sticky' || zIndex > 100) &&
+                current.offsetHeight > 50 &&
+                current.querySelectorAll('button, a').length > 0) {
+                return current;
+            }
+            current = current.parentElement;
+        }
+        return null;
+    };
+
+    if (!document.body) return null;
+    const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT, {
+        acceptNode: (node) => {
+            const tag = node.parentElement && node.parentElement.tagName;
+            if (tag === 'SCRIPT' || tag === 'STYLE' || tag === 'NOSCRIPT') return NodeFilter.FILTER_REJECT;
+            return re.test(node.data) ? NodeFilter.FILTER_ACCEPT : NodeFilter.FILTER_SKIP;
+        }
+    });
+
+    let fallback = null;
+    for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+        const el = node.parentElement;
+        if (!isVisible(el)) continue;
+        const container = findContainer(el);
+        if (container) {
+            container.setAttribute(marker, '');
+            return {text: node.data.trim().slice(0, 80), container: true};
+        }
+        if (!fallback) fallback = el;
+    }
+
+    if (fallback) {
+        (fallback.parentElement || fallback).setAttribute(marker, '');
+        return {text: fallback.innerText.trim().slice(0, 80), container: false};
+    }
+    return null;
+}
+"""
+
+
+FIND_CMP_MARKERS_JS = """
+(markers) => {
+    const html = document.documentElement ? document.documentElement.outerHTML.toLowerCase() : '';
+    return Object.keys(markers).filter(name => markers[name].some(marker => html.includes(marker)));
+}
+"""
+
+
+FIND_CMP_BUTTONS_JS = """
+(root, [groups, checkVisible]) => {
+    """ + IS_VISIBLE_JS + """
+
+    // Each probe is [css, texts, notTexts], the in-page form of a Playwright
+    // selector using :has-text()
+    const matches = (el, texts, notTexts) => {
+        if (!texts.length && !notTexts.length) return true;
+        const text = (el.innerText || el.textContent || '').toLowerCase();
+        return texts.every(t => text.includes(t)) && !notTexts.some(t => text.includes(t));
+    };
+
+    return groups.map(probes => probes.findIndex(([css, texts, notTexts]) => {
+        let elements;
+        try {
+            elements = root.querySelectorAll(css);
+        } catch (e) {
+            return false;
+        }
+        for (const el of elements) {
+            if (matches(el, texts, notTexts) && (!checkVisible || isVisible(el))) return true;
+        }
+        return false;
+    }));
+}
+"""
 
+
+# Probes the CMP button selectors of consent_managers.yml in order and returns
+# the index of the first visible match, plus the probes the browser could not
+# parse (Playwright-only syntax). Open shadow roots are searched too
+# (Usercentrics, cmm-cookie-banner)
+PROBE_CMP_SELECTORS_JS = """
+(probes) => {
+    """ + IS_VISIBLE_JS + """
+
+    """ + QUERY_DEEP_JS + """
+
+    const invalid = [];
+    for (let i = 0; i < probes.length; i++) {
+        const [css, anyVisible] = probes[i];
+        try {
+            if (anyVisible) {
+                for (const el of queryAllDeep(css)) {
+                    if (isVisible(el)) return {match: i, invalid};
+                }
+            } else {
+                const el = queryDeep(css);
+                if (el && isVisible(el)) return {match: i, invalid};
+            }
+        } catch (e) {
+            invalid.push(i);
+        }
+    }
+    return {match: -1, invalid};
+}
+"""
+
+
+@functools.lru_cache(maxsize=1)
 def load_audit_selectors():
-    """Load audit selector patterns from YAML file."""
+    """
+    Load audit selector patterns from YAML file.
+
+    The YAML is parsed once per process; callers share the returned dict and
+    must not mutate it.
+    """
     with open(AUDIT_SELECTORS_FILE, "r") as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=YAML_LOADER)
+
+
+@functools.lru_cache(maxsize=None)
+def get_detection_keyword_pattern(languages: Tuple[str, ...]) -> str:
+    """
+    Build a JavaScript regex source matching any cookie/consent keyword of
+    the given languages (detection_keywords in audit_selectors.yml).
+    """
+    keywords_config = load_audit_selectors().get("detection_keywords", {})
+
+    all_keywords = []
+    for lang in languages:
+        lang_keywords = keywords_config.get(lang, {})
+        all_keywords.extend(lang_keywords.get("cookies", []))
+        all_keywords.extend(lang_keywords.get("consent", []))
+
+    # Longest first so alternation prefers "cookies" over "cookie"
+    all_keywords = sorted(set(all_keywords), key=len, reverse=True)
+    return "|".join(_JS_REGEX_SPECIAL.sub(r"\\\g<0>", keyword) for keyword in all_keywords)
+
+
+@functools.lru_cache(maxsize=None)
+def split_text_selector(selector: str) -> Tuple[str, Tuple[str, ...], Tuple[str, ...]]:
+    """
+    Split a Playwright selector using :has-text() into plain CSS plus the
+    (lowercased) texts it must and must not contain, for use in page scripts.
+    """
+    not_texts = tuple(t.lower() for t in _NOT_HAS_TEXT_RE.findall(selector))
+    css = _NOT_HAS_TEXT_RE.sub("", selector)
+    texts = tuple(t.lower() for t in _HAS_TEXT_RE.findall(css))
+    css = _HAS_TEXT_RE.sub("", css).strip() or "*"
+    return css, texts, not_texts
+
+
+async def select_hardcoded_detectors(page: Page) -> Tuple[Tuple[str, Callable], ...]:
+    """
+    Keep the hardcoded detectors whose markers appear in the page HTML or in
+    a frame URL/name (one evaluate instead of running every detector).
 
+    Args:
+        page: Playwright Page object
 
-async def find_banner_container_from_button(button_locator: Locator) -> Optional[Locator]:
+    Returns:
+        Subset of _HARDCODED_DETECTORS, in priority order (all of them if the
+        page could not be inspected)
+    """
+    try:
+        present = set(await page.evaluate(FIND_CMP_MARKERS_JS, _HARDCODED_DETECTOR_MARKERS))
+    except Exception as e:
+        logging.debug(f"CMP marker scan failed: {e}")
+        return _HARDCODED_DETECTORS
+
+    frames_info = " ".join(f"{frame.url} {frame.name}" for frame in page.frames).lower()
+    return tuple(
+        (cmp_name, detector_func)
+        for cmp_name, detector_func in _HARDCODED_DETECTORS
+        if cmp_name in present or any(marker in frames_info for marker in _HARDCODED_DETECTOR_MARKERS[cmp_name])
+    )
+
+
+async def extract_hardcoded_cmp_buttons(modal: Locator, cmp_name: str) -> List[ButtonInfo]:
+    """
+    Extract the known buttons of a hardcoded CMP in a single evaluate.
+
+    For each role of _HARDCODED_CMP_BUTTONS, the first selector matching inside
+    the modal is reported.
+
+    Args:
+        modal: Locator of the modal returned by the hardcoded detector
+        cmp_name: Detector name
+
+    Returns:
+        List of ButtonInfo (empty for CMPs without known buttons)
+    """
+    button_groups = _HARDCODED_CMP_BUTTONS.get(cmp_name)
+    if not button_groups:
+        return []
+
+    probes = [[split_text_selector(selector) for selector in selectors] for _, _, selectors in button_groups]
+    check_visible = cmp_name not in _HARDCODED_CMP_BUTTONS_PRESENCE_ONLY
+    # The modal was just found: fail fast if it is gone rather than waiting
+    # for Playwright's default 30 s
+    matched = await modal.evaluate(FIND_CMP_BUTTONS_JS, [probes, check_visible], timeout=1000)
+
+    buttons = []
+    for (role, label, selectors), index in zip(button_groups, matched):
+        if index >= 0:
+            buttons.append(ButtonInfo(
+                text=label,
+                role=role,
+                selector=selectors[index],
+                is_visible=True
+            ))
+    return buttons
+
+
+def climb_locator(locator: Locator, levels: int) -> Locator:
+    """
+    Locator of the ancestor `levels` levels above the element (the element
+    itself for 0), as a single XPath step rather than chained '..' locators.
+    """
+    if levels <= 0:
+        return locator
+    return locator.locator("xpath=" + "/".join([".."] * levels)).first
+
+
+# Climbs up to 6 levels from a CMP button to the banner container and returns
+# {found, selector, level}
+FIND_CONTAINER_FROM_BUTTON_JS = """
+(button) => {
+    const consentRe = """ + CONSENT_KEYWORDS_RE_JS + """;
+
+    """ + UNIQUE_SELECTOR_JS + """
+
+    let current = button;
+    let maxLevels = 6;
+    let level = 0;
+
+    while (current && current !== document.body && level < maxLevels) {
+        // Compter les boutons dans cet élément
+        const buttons = current.querySelectorAll('button, a[role="button"], a[href]');
+        const buttonsCount = buttons.length;
+
+        // Vérifier la taille
+        const rect = current.getBoundingClientRect();
+        const height = rect.height;
+        const width = rect.width;
+
+        // Vérifier le z-index et position
+        const style = window.getComputedStyle(current);
+        const zIndex = parseInt(style.zIndex) || 0;
+        const position = style.position;
+
+        // Vérifier présence de texte
+        const text = current.innerText || '';
+        const hasConsentKeywords = consentRe.test(text);
+
+        // Critères pour être un conteneur de bannière
+        if (buttonsCount >= 2 &&           // Au moins 2 boutons
+            height > 50 &&                 // Hauteur raisonnable
+            width > 200 &&                 // Largeur raisonnable
+            hasConsentKeywords &&          // Contient mots-clés
+            (position === 'fixed' ||
+             position === 'sticky' ||
+             position === 'absolute' ||
+             zIndex > 50)) {
+
+            // Construire un sélecteur unique dans la page pour éviter
+            // les allers-retours de vérification côté Python
+            return {
+                found: true,
+                selector: uniqueSelector(current),
+                level: level
+            };
+        }
+
+        current = current.parentElement;
+        level++;
+    }
+
+    return { found: false };
+}
+"""
+
+
+async def find_banner_container_from_button(button_locator: Locator, root: Optional[Union[Page, FrameLocator]] = None) -> Optional[Locator]:
     """
     Remonte depuis un bouton jusqu'au conteneur de la bannière complète.
 
@@ -51,110 +590,35 @@ async def find_banner_container_from_button(button_locator: Locator) -> Optional
 
     Args:
         button_locator: Locator du bouton Accept détecté
+        root: Page ou FrameLocator contenant le bouton (par défaut la page du
+            bouton) ; le sélecteur du conteneur y est résolu
 
     Returns:
         Locator du conteneur de bannière, ou None si pas trouvé
     """
     try:
         # Utiliser evaluate pour remonter l'arbre DOM
-        container_info = await button_locator.evaluate("""
-            (button) => {
-                let current = button;
-                let maxLevels = 6;
-                let level = 0;
-
-                while (current && current !== document.body && level < maxLevels) {
-                    // Compter les boutons dans cet élément
-                    const buttons = current.querySelectorAll('button, a[role="button"], a[href]');
-                    const buttonsCount = buttons.length;
-
-                    // Vérifier la taille
-                    const rect = current.getBoundingClientRect();
-                    const height = rect.height;
-                    const width = rect.width;
-
-                    // Vérifier le z-index et position
-                    const style = window.getComputedStyle(current);
-                    const zIndex = parseInt(style.zIndex) || 0;
-                    const position = style.position;
-
-                    // Vérifier présence de texte
-                    const text = current.innerText || '';
-                    const hasConsentKeywords = /cookie|consent|privacy|confidentialité|données|paramètre/i.test(text);
-
-                    // Critères pour être un conteneur de bannière
-                    if (buttonsCount >= 2 &&           // Au moins 2 boutons
-                        height > 50 &&                 // Hauteur raisonnable
-                        width > 200 &&                 // Largeur raisonnable
-                        hasConsentKeywords &&          // Contient mots-clés
-                        (position === 'fixed' ||
-                         position === 'sticky' ||
-                         position === 'absolute' ||
-                         zIndex > 50)) {
-
-                        // Retourner les infos pour recréer un sélecteur
-                        return {
-                            found: true,
-                            id: current.id,
-                            className: current.className,
-                            tagName: current.tagName.toLowerCase(),
-                            level: level
-                        };
-                    }
-
-                    current = current.parentElement;
-                    level++;
-                }
-
-                return { found: false };
-            }
-        """)
+        container_info = await button_locator.evaluate(FIND_CONTAINER_FROM_BUTTON_JS)
 
         if container_info and container_info.get('found'):
-            # Reconstruire le locator basé sur les infos
-            page = button_locator.page
-
-            # Essayer d'abord par ID
-            if container_info.get('id'):
-                container = page.locator(f"#{container_info['id']}").first
-                try:
-                    if await container.is_visible(timeout=1000):
-                        logging.debug(f"Found banner container by ID: {container_info['id']}")
-                        return container
-                except:
-                    pass
-
-            # Sinon par classe (première classe)
-            if container_info.get('className'):
-                first_class = str(container_info['className']).split()[0] if container_info['className'] else None
-                if first_class and first_class.strip():
-                    try:
-                        container = page.locator(f".{first_class}").first
-                        if await container.is_visible(timeout=1000):
-                            logging.debug(f"Found banner container by class: {first_class}")
-                            return container
-                    except:
-                        pass
+            # Le conteneur vient d'être trouvé dans le même tour JS : pas
+            # besoin de revérifier sa visibilité
+            if container_info.get('selector'):
+                logging.debug(f"Found banner container: {container_info['selector']}")
+                if root is None:
+                    root = button_locator.page
+                return root.locator(container_info['selector']).first
 
             # En dernier recours, remonter manuellement
-            try:
-                parent = button_locator
-                for _ in range(container_info.get('level', 3)):
-                    parent = parent.locator('..').first
-                logging.debug(f"Found banner container by traversing {container_info.get('level')} levels")
-                return parent
-            except:
-                pass
+            logging.debug(f"Found banner container by traversing {container_info.get('level')} levels")
+            return climb_locator(button_locator, container_info.get('level', 3))
 
     except Exception as e:
         logging.debug(f"Error finding banner container: {e}")
 
     # Fallback : remonter de 3 niveaux par défaut
-    try:
-        logging.debug("Using fallback: going up 3 levels")
-        return button_locator.locator('..').locator('..').locator('..').first
-    except:
-        return button_locator
+    logging.debug("Using fallback: going up 3 levels")
+    return climb_locator(button_locator, 3)
 
 
 async def detect_banner(page: Page, cmp_configs: List[dict], config: AuditConfig) -> Optional[BannerInfo]:
@@ -178,194 +642,30 @@ async def detect_banner(page: Page, cmp_configs: List[dict], config: AuditConfig
     """
     # 0. Try Hardcoded CMP detectors (Python functions)
     # These are for complex CMPs that require specific logic not expressible in YAML
-    detectors = [
-        ("sourcepoint", detect_sourcepoint_modal),
-        ("onetrust", detect_onetrust_modal),
-        ("didomi", detect_didomi_modal),
-        ("orejime", detect_orejime_modal),
-        ("trust_commander", detect_trust_commander_modal),
-        ("sfbx", detect_sfbx_modal),
-        ("lemonde", detect_lemonde_wall),
-    ]
-
-    for cmp_name, detector_func in detectors:
+    # (see _HARDCODED_DETECTORS)
+    async def run_detector(cmp_name, detector_func) -> Optional[Locator]:
+        try:
+            return await detector_func(page)
+        except Exception as e:
+            logging.debug(f"Hardcoded detector {cmp_name} failed: {e}")
+            return None
+
+    # Only the detectors whose CMP leaves a trace in the page are run. They
+    # only probe the page, so run them concurrently and keep the first hit in
+    # priority order
+    detectors = await select_hardcoded_detectors(page)
+    modals = await asyncio.gather(*[run_detector(cmp_name, detector_func) for cmp_name, detector_func in detectors])
+
+    for (cmp_name, _), modal in zip(detectors, modals):
         try:
-            modal = await detector_func(page)
             if modal:
                 logging.info(f"Banner detected using hardcoded detector: {cmp_name}")
                 
                 buttons = []
-                if cmp_name == "lemonde":
-                    # Extract Le Monde buttons
-                    try:
-                        accept_btn = modal.locator("button[data-gdpr-expression='acceptAll']")
-                        if await accept_btn.count() > 0:
-                            buttons.append(ButtonInfo(
-                                text="Accéder gratuitement",
-                                role="accept_all",
-                                selector="button[data-gdpr-expression='acceptAll']",
-                                is_visible=True
-                            ))
-                        
-                        subscribe_btn = modal.locator(".js-gdpr-deny-subscribe")
-                        if await subscribe_btn.count() > 0:
-                            buttons.append(ButtonInfo(
-                                text="S'abonner",
-                                role="reject_all", # Effectively rejecting consent by paying
-                                selector=".js-gdpr-deny-subscribe",
-                                is_visible=True
-                            ))
-                    except Exception as e:
-                        logging.warning(f"Error extracting Le Monde buttons: {e}")
-
-                elif cmp_name == "onetrust":
-                    # Extract OneTrust buttons (Banner + Preference Center)
-                    try:
-                        # Accept All (Banner & PC)
-                        accept_selectors = [
-                            "#onetrust-accept-btn-handler",
-                            "#accept-recommended-btn-handler",
-                            ".save-preference-btn-handler" # Often "Save & Exit" acts as accept if all selected or default
-                        ]
-                        for sel in accept_selectors:
-                            btn = modal.locator(sel)
-                            if await btn.count() > 0 and await btn.first.is_visible():
-                                buttons.append(ButtonInfo(
-                                    text="Accept",
-                                    role="accept_all",
-                                    selector=sel,
-                                    is_visible=True
-                                ))
-                                break # Found one accept button
-
-                        # Reject All (Banner & PC)
-                        reject_selectors = [
-                            "#onetrust-reject-all-handler",
-                            ".ot-pc-refuse-all-handler"
-                        ]
-                        for sel in reject_selectors:
-                            btn = modal.locator(sel)
-                            if await btn.count() > 0 and await btn.first.is_visible():
-                                buttons.append(ButtonInfo(
-                                    text="Reject",
-                                    role="reject_all",
-                                    selector=sel,
-                                    is_visible=True
-                                ))
-                                break
-
-                        # Manage Preferences (Banner)
-                        manage_selectors = ["#onetrust-pc-btn-handler"]
-                        for sel in manage_selectors:
-                            btn = modal.locator(sel)
-                            if await btn.count() > 0 and await btn.first.is_visible():
-                                buttons.append(ButtonInfo(
-                                    text="Manage",
-                                    role="settings",
-                                    selector=sel,
-                                    is_visible=True
-                                ))
-                                break
-                    except Exception as e:
-                        logging.warning(f"Error extracting OneTrust buttons: {e}")
-
-                elif cmp_name == "trust_commander":
-                    # Extract Trust Commander buttons
-                    try:
-                        # Accept All
-                        accept_selectors = [
-                            "#footer_tc_privacy_button_2", # Cdiscount specific
-                            "#popin_tc_privacy_button_2", # Credit Agricole specific
-                            "[title='Accepter']",
-                            "[title='Accepter et fermer']",
-                            "button:has-text('Accepter'):not(:has-text('sans'))" # Avoid "Continuer sans accepter"
-                        ]
-                        for sel in accept_selectors:
-                            btn = modal.locator(sel)
-                            if await btn.count() > 0 and await btn.first.is_visible():
-                                buttons.append(ButtonInfo(
-                                    text="Accepter",
-                                    role="accept_all",
-                                    selector=sel,
-                                    is_visible=True
-                                ))
-                                break
-
-                        # Reject All
-                        reject_selectors = [
-                            "#footer_tc_privacy_button_3", # Cdiscount specific
-                            "#popin_tc_privacy_button_3", # Credit Agricole specific
-                            "[title='Continuer sans accepter']",
-                            "button:has-text('Continuer sans accepter')"
-                        ]
-                        for sel in reject_selectors:
-                            btn = modal.locator(sel)
-                            if await btn.count() > 0 and await btn.first.is_visible():
-                                buttons.append(ButtonInfo(
-                                    text="Continuer sans accepter",
-                                    role="reject_all",
-                                    selector=sel,
-                                    is_visible=True
-                                ))
-                                break
-
-                        # Settings
-                        settings_selectors = [
-                            "#footer_tc_privacy_button", # Cdiscount specific
-                            "#popin_tc_privacy_button", # Credit Agricole specific
-                            "[title='Paramétrer les cookies']",
-                            "[title='Personnaliser mes choix']",
-                            "button:has-text('Paramétrer')",
-                            "button:has-text('Personnaliser')"
-                        ]
-                        for sel in settings_selectors:
-                            btn = modal.locator(sel)
-                            if await btn.count() > 0 and await btn.first.is_visible():
-                                buttons.append(ButtonInfo(
-                                    text="Paramétrer",
-                                    role="settings",
-                                    selector=sel,
-                                    is_visible=True
-                                ))
-                                break
-
-                    except Exception as e:
-                        logging.warning(f"Error extracting Trust Commander buttons: {e}")
-
-                elif cmp_name == "orejime":
-                    # Extract Orejime buttons
-                    try:
-                        # Accept All
-                        accept_btn = modal.locator(".orejime-Button--save")
-                        if await accept_btn.count() > 0:
-                            buttons.append(ButtonInfo(
-                                text="Accepter",
-                                role="accept_all",
-                                selector=".orejime-Button--save",
-                                is_visible=True
-                            ))
-                        
-                        # Reject All
-                        reject_btn = modal.locator(".orejime-Button--decline")
-                        if await reject_btn.count() > 0:
-                            buttons.append(ButtonInfo(
-                                text="Refuser",
-                                role="reject_all",
-                                selector=".orejime-Button--decline",
-                                is_visible=True
-                            ))
-                            
-                        # Settings
-                        settings_btn = modal.locator(".orejime-Button--info")
-                        if await settings_btn.count() > 0:
-                            buttons.append(ButtonInfo(
-                                text="Personnaliser",
-                                role="settings",
-                                selector=".orejime-Button--info",
-                                is_visible=True
-                            ))
-                    except Exception as e:
-                        logging.warning(f"Error extracting Orejime buttons: {e}")
+                try:
+                    buttons = await extract_hardcoded_cmp_buttons(modal, cmp_name)
+                except Exception as e:
+                    logging.warning(f"Error extracting {cmp_name} buttons: {e}")
 
                 # Create BannerInfo directly
                 return BannerInfo(
@@ -376,7 +676,7 @@ async def detect_banner(page: Page, cmp_configs: List[dict], config: AuditConfig
                     buttons=buttons
                 )
         except Exception as e:
-            logging.debug(f"Hardcoded detector {cmp_name} failed: {e}")
+            logging.debug(f"Button extraction for {cmp_name} failed: {e}")
 
     # Strategy 1: CMP-specific detection (YAML based)
     cmp_info, banner_locator, iframe_info = await detect_cmp_banner(page, cmp_configs)
@@ -399,24 +699,62 @@ async def detect_banner(page: Page, cmp_configs: List[dict], config: AuditConfig
     if banner_info:
         return banner_info
 
-    # Strategy 4: Search in iframes
+    # Strategies 4 (iframes) and 5 (shadow DOM) look at different documents,
+    # so run them concurrently and keep the first hit in that order
+    searches = []
     if config.support_nested_iframes:
-        banner_info = await search_in_iframes(page, lambda p: detect_generic_banner(p, config), max_depth=2)
-        if banner_info:
-            banner_info.in_iframe = True
-            return banner_info
-
-    # Strategy 5: Search in shadow DOM
+        searches.append(("in_iframe", search_in_iframes(page, lambda p: detect_generic_banner(p, config), max_depth=2)))
     if config.support_shadow_dom:
-        banner_info = await search_in_shadow_dom(page)
-        if banner_info:
-            banner_info.in_shadow_dom = True
+        searches.append(("in_shadow_dom", search_in_shadow_dom(page)))
+
+    results = await asyncio.gather(*[search for _, search in searches], return_exceptions=True)
+    for (flag, _), banner_info in zip(searches, results):
+        if isinstance(banner_info, Exception):
+            logging.debug(f"Banner search ({flag}) failed: {banner_info}")
+        elif banner_info:
+            setattr(banner_info, flag, True)
             return banner_info
 
     # No banner detected
     return BannerInfo(detected=False)
 
 
+# (cmp_configs, compiled probes) of the last compile_cmp_probes call; the
+# configs are loaded once, so this is computed once per process
+_cmp_probes_cache = (None, None)
+
+
+def compile_cmp_probes(cmp_configs: List[dict]) -> Tuple[Tuple[Tuple[int, str, str], ...], List[list], frozenset]:
+    """
+    Flatten the selectors of the CMPs without iframe steps for the fast pass
+    of detect_cmp_banner.
+
+    Args:
+        cmp_configs: List of CMP configurations
+
+    Returns:
+        Tuple of ((cmp index, action type, selector) per probe, the matching
+        PROBE_CMP_SELECTORS_JS argument, indexes of the probed CMPs)
+    """
+    global _cmp_probes_cache
+
+    cached_configs, compiled = _cmp_probes_cache
+    if cached_configs is cmp_configs:
+        return compiled
+
+    probes = tuple(
+        (index, action["type"], selector)
+        for index, cmp in enumerate(cmp_configs)
+        if all(action["type"] != "iframe" for action in cmp["actions"])
+        for action in cmp["actions"]
+        for selector in (action["value"] if action["type"] == "css-selector-list" else [action["value"]])
+    )
+    probe_args = [[selector.replace(":visible", ""), ":visible" in selector] for _, _, selector in probes]
+    compiled = (probes, probe_args, frozenset(index for index, _, _ in probes))
+    _cmp_probes_cache = (cmp_configs, compiled)
+    return compiled
+
+
 async def detect_cmp_banner(page: Page, cmp_configs: List[dict]) -> Tuple[Optional[dict], Optional[Locator], Optional[dict]]:
     """
     Detect banner using CMP-specific selectors from consent_managers.yml.
@@ -431,50 +769,73 @@ async def detect_cmp_banner(page: Page, cmp_configs: List[dict]) -> Tuple[Option
         Tuple of (cmp_info dict, banner_locator, iframe_info dict) or (None, None, None)
         iframe_info contains: {"selector": str, "src": str} if banner is in iframe
     """
-    for cmp in cmp_configs:
+    # Fast pass: CMPs without iframe steps are checked with one evaluate on
+    # the main page instead of an is_visible() round-trip per selector
+    probes, probe_args, probe_indexes = compile_cmp_probes(cmp_configs)
+    probed = set()
+    matched = None
+    try:
+        result = await page.evaluate(PROBE_CMP_SELECTORS_JS, probe_args)
+        # CMPs with a selector the browser cannot parse stay on the slow path
+        unparsed = {probes[i][0] for i in result["invalid"]}
+        probed = probe_indexes - unparsed
+        if result["match"] >= 0:
+            matched = probes[result["match"]]
+    except Exception as e:
+        logging.debug(f"CMP selector probe failed: {e}")
+
+    for index, cmp in enumerate(cmp_configs):
         parent_locator = page
         locator = None
         iframe_info = None
 
         try:
-            for action in cmp["actions"]:
-                if action["type"] == "iframe":
-                    # Check if iframe exists
-                    if await parent_locator.locator(action["value"]).count() > 0:
-                        # Get iframe src before switching context
-                        try:
-                            iframe_element = await parent_locator.locator(action["value"]).first.element_handle()
-                            iframe_src = await iframe_element.get_attribute("src") if iframe_element else None
-                        except:
-                            iframe_src = None
-
-                        parent_locator = parent_locator.frame_locator(action["value"]).first
-                        iframe_info = {"selector": action["value"], "src": iframe_src}
-                        logging.debug(f"Switching to iframe: {action['value']}")
-                    else:
-                        break
-
-                elif action["type"] == "css-selector":
-                    if await parent_locator.locator(action["value"]).first.is_visible(timeout=1000):
-                        locator = parent_locator.locator(action["value"]).first
-                        break
-
-                elif action["type"] == "css-selector-list":
-                    for selector in action["value"]:
-                        try:
-                            if await parent_locator.locator(selector).first.is_visible(timeout=500):
-                                locator = parent_locator.locator(selector).first
-                                cmp["matched_selector"] = selector
-                                break
-                        except:
-                            continue
-                    if locator:
-                        break
+            if index in probed:
+                if matched is None or matched[0] != index:
+                    continue
+                _, _, selector = matched
+                locator = page.locator(selector).first
+
+            else:
+                for action in cmp["actions"]:
+                    if action["type"] == "iframe":
+                        # Check if iframe exists
+                        iframe_locator = parent_locator.locator(action["value"])
+                        if await iframe_locator.count() > 0:
+                            # Get iframe src before switching context
+                            try:
+                                iframe_src = await iframe_locator.first.get_attribute("src", timeout=1000)
+                            except Exception:
+                                iframe_src = None
+
+                            parent_locator = parent_locator.frame_locator(action["value"]).first
+                            iframe_info = {"selector": action["value"], "src": iframe_src}
+                            logging.debug(f"Switching to iframe: {action['value']}")
+                        else:
+                            break
+
+                    elif action["type"] == "css-selector":
+                        candidate = parent_locator.locator(action["value"]).first
+                        if await candidate.is_visible(timeout=1000):
+                            locator = candidate
+                            break
+
+                    elif action["type"] == "css-selector-list":
+                        for selector in action["value"]:
+                            try:
+                                candidate = parent_locator.locator(selector).first
+                                if await candidate.is_visible(timeout=500):
+                                    locator = candidate
+                                    break
+                            except Exception:
+                                continue
+                        if locator:
+                            break
 
             if locator is not None:
                 logging.debug(f"Found CMP button: {cmp['id']}")
                 # Remonter au conteneur de la bannière
-                banner_container = await find_banner_container_from_button(locator)
+                banner_container = await find_banner_container_from_button(locator, parent_locator)
                 if banner_container:
                     logging.debug(f"Found banner container for {cmp['id']}")
                     return cmp, banner_container, iframe_info
@@ -505,53 +866,17 @@ async def detect_generic_banner(page: Page, config: AuditConfig) -> Optional[Ban
     Returns:
         BannerInfo if detected, None otherwise
     """
-    # 1. Try CMP-specific detectors first (most reliable)
-    # Note: The user's instruction implies a 'detectors' list here, but the current
-    # detect_cmp_banner already handles CMP-specific detection via cmp_configs.
-    # If this list is intended for *additional* hardcoded CMP detectors not in cmp_configs,
-    # it should be placed in a logical spot, likely before the generic selectors.
-    # For now, I'm adding it as per the instruction's placement, assuming it's a new
-    # set of selectors/logic for generic detection that includes CMP-like patterns.
-    # This interpretation makes the most sense to maintain syntactical correctness
-    # while incorporating the user's explicit "Code Edit" content.
-    detectors = [
-        ("sourcepoint", detect_sourcepoint_modal),
-        ("onetrust", detect_onetrust_modal),
-        ("didomi", detect_didomi_modal),
-        ("orejime", detect_orejime_modal),
-        ("trust_commander", detect_trust_commander_modal),
-        ("sfbx", detect_sfbx_modal),
-        ("lemonde", detect_lemonde_wall),
-    ]
-
-    selectors = [
-        "[role='dialog']",
-        "[aria-modal='true']",
-        ".modal.show",
-        ".modal[style*='display: block']",
-        ".popup[style*='display: block']",
-        "[class*='cookie'][class*='banner']:visible",
-        "[class*='consent'][class*='banner']:visible",
-        "[id*='cookie'][id*='banner']",
-        "[id*='consent'][id*='banner']",
-    ]
-
-    for selector in selectors:
-        try:
-            locator = page.locator(selector).first
-            if await locator.is_visible(timeout=500):
-                # Validate it contains cookie/consent keywords
-                text = await locator.inner_text(timeout=1000)
-                text_lower = text.lower()
-
-                keywords = ["cookie", "consent", "privacy", "données", "confidentialité"]
-                if any(keyword in text_lower for keyword in keywords):
-                    banner_info = await extract_banner_info(locator, None, "generic")
-                    return banner_info
+    try:
+        # One round-trip: all selectors are probed inside the page and the
+        # first visible match mentioning cookies/consent is tagged
+        found = await page.evaluate(FIND_GENERIC_BANNER_JS, [GENERIC_BANNER_SELECTORS, GENERIC_BANNER_KEYWORDS])
+        if found:
+            logging.debug(f"Generic banner matched selector: {found}")
+            locator = page.locator(f"[{BANNER_MARKER_ATTRIBUTE}]").first
+            return await extract_banner_info(locator, None, "generic")
 
-        except Exception as e:
-            logging.debug(f"Generic detection failed for selector {selector}: {e}")
-            continue
+    except Exception as e:
+        logging.debug(f"Generic detection failed: {e}")
 
     return None
 
@@ -569,245 +894,113 @@ async def detect_text_based_banner(page: Page, languages: List[str]) -> Optional
     Returns:
         BannerInfo if detected, None otherwise
     """
-    audit_selectors = load_audit_selectors()
-    keywords_config = audit_selectors.get("detection_keywords", {})
-
-    all_keywords = []
-    for lang in languages:
-        lang_keywords = keywords_config.get(lang, {})
-        all_keywords.extend(lang_keywords.get("cookies", []))
-        all_keywords.extend(lang_keywords.get("consent", []))
-
-    # Use Playwright's text selector
-    for keyword in all_keywords:
-        try:
-            # Look for elements containing the keyword
-            locator = page.locator(f":has-text('{keyword}')").first
-            if await locator.is_visible(timeout=500):
-                # Get the closest container with a reasonable size
-                # This helps avoid selecting the whole body
-                banner_locator = await find_banner_container(locator)
-                if banner_locator:
-                    banner_info = await extract_banner_info_safe(banner_locator, None, "text_based")
-                    return banner_info
-
-        except Exception as e:
-            logging.debug(f"Text detection failed for keyword {keyword}: {e}")
-            continue
-
-    return None
-
-
-async def find_banner_container(text_locator: Locator) -> Optional[Locator]:
-    """
-    Find the appropriate container element for a banner given a text locator.
-
-    Looks for parent elements with common banner characteristics:
-    - position: fixed
-    - high z-index
-    - reasonable size
-    - contains buttons
-
-    Args:
-        text_locator: Locator pointing to text containing keywords
+    pattern = get_detection_keyword_pattern(tuple(languages))
+    if not pattern:
+        return None
 
-    Returns:
-        Locator for the banner container, or None
-    """
     try:
-        # Try to find a parent with position:fixed or high z-index
-        container = await text_locator.evaluate("""
-            (el) => {
-                let current = el;
-                while (current && current !== document.body) {
-                    const style = window.getComputedStyle(current);
-                    const zIndex = parseInt(style.zIndex) || 0;
-                    const position = style.position;
-
-                    if ((position === 'fixed' || position === 'sticky' || zIndex > 100) &&
-                        current.offsetHeight > 50 &&
-                        current.querySelectorAll('button, a').length > 0) {
-                        return current.className + '#' + current.id;
-                    }
-                    current = current.parentElement;
-                }
-                return null;
-            }
-        """)
-
-        if container:
-            class_name, id_name = container.split('#')
-            if id_name:
-                return text_locator.page.locator(f"#{id_name}").first
-            elif class_name:
-                return text_locator.page.locator(f".{class_name.split()[0]}").first
+        # One round-trip: find visible text matching any keyword and climb to
+        # its banner container inside the page
+        found = await page.evaluate(FIND_TEXT_BANNER_JS, pattern)
+        if found:
+            logging.debug(f"Text-based banner matched: {found}")
+            banner_locator = page.locator(f"[{BANNER_MARKER_ATTRIBUTE}]").first
+            return await extract_banner_info_safe(banner_locator, None, "text_based")
 
     except Exception as e:
-        logging.debug(f"Error finding banner container: {e}")
+        logging.debug(f"Text detection failed: {e}")
 
-    # Fallback: return the text locator's parent
-    return text_locator.locator('..').first
-
-
-async def find_banner_container_safe(text_locator: Locator, page: Page) -> Optional[Locator]:
-    """
-    Version sécurisée de find_banner_container avec timeout et fallbacks.
-
-    Args:
-        text_locator: Locator vers le texte contenant des keywords
-        page: Page Playwright
-
-    Returns:
-        Locator du conteneur de bannière ou fallback
-    """
-    try:
-        # Vérifier que le locator est toujours valide
-        if not await text_locator.is_visible(timeout=500):
-            return None
-
-        # Évaluation avec timeout explicite
-        container_info = await asyncio.wait_for(
-            text_locator.evaluate("""
-                (el) => {
-                    let current = el;
-                    let maxLevels = 8;
-                    let level = 0;
-
-                    while (current && current !== document.body && level < maxLevels) {
-                        const style = window.getComputedStyle(current);
-                        const zIndex = parseInt(style.zIndex) || 0;
-                        const position = style.position;
-                        const rect = current.getBoundingClientRect();
-
-                        // Critères de bannière
-                        const hasButtons = current.querySelectorAll('button, a[role="button"]').length >= 2;
-                        const hasSize = rect.height > 50 && rect.width > 200;
-                        const hasKeywords = /cookie|consent|privacy|confidentialité|données/i.test(current.innerText || '');
-                        const hasPosition = position === 'fixed' || position === 'sticky' || position === 'absolute' || zIndex > 50;
-
-                        if (hasButtons && hasSize && hasKeywords && hasPosition) {
-                            return {
-                                found: true,
-                                id: current.id,
-                                className: current.className,
-                                level: level
-                            };
-                        }
-
-                        current = current.parentElement;
-                        level++;
-                    }
+    return None
 
-                    return {found: false};
-                }
-            """),
-            timeout=3.0
-        )
 
-        if not container_info or not container_info.get('found'):
-            # Fallback simple : remonter 3 niveaux
-            try:
-                return text_locator.locator('..').locator('..').locator('..').first
-            except:
-                return text_locator
+# innerHTML and innerText of a banner, truncated in the browser so that large
+# containers are not serialised in full only to be sliced in Python
+READ_BANNER_CONTENT_JS = """
+(el, maxLength) => [
+    el.innerHTML.slice(0, maxLength),
+    (el.innerText || '').slice(0, maxLength),
+]
+"""
 
-        # Reconstruire locator depuis les infos
-        if container_info.get('id'):
-            try:
-                container = page.locator(f"#{container_info['id']}").first
-                if await container.is_visible(timeout=1000):
-                    return container
-            except:
-                pass
-
-        if container_info.get('className'):
-            first_class = str(container_info['className']).split()[0]
-            if first_class:
-                try:
-                    container = page.locator(f".{first_class}").first
-                    if await container.is_visible(timeout=1000):
-                        return container
-                except:
-                    pass
 
-        # Fallback manuel par remontée
-        try:
-            parent = text_locator
-            for _ in range(container_info.get('level', 3)):
-                parent = parent.locator('..').first
-            return parent
-        except:
-            return text_locator
-
-    except asyncio.TimeoutError:
-        logging.warning("find_banner_container timed out, using fallback")
-        try:
-            return text_locator.locator('..').locator('..').first
-        except:
-            return text_locator
-    except Exception as e:
-        logging.debug(f"find_banner_container_safe error: {e}")
-        return text_locator
+# Attend (waitMs au plus) que le texte de la bannière change après les clics
+# d'expansion : aria-expanded bascule dès le clic, avant le contenu
+WAIT_TEXT_CHANGE_JS = """
+(el, [before, waitMs]) => new Promise(resolve => {
+    const deadline = performance.now() + waitMs;
+    const check = () => {
+        if (el.innerText !== before) return resolve(true);
+        if (performance.now() >= deadline) return resolve(false);
+        setTimeout(check, 20);
+    };
+    check();
+})
+"""
 
 
-async def extract_all_text_from_banner(banner_locator: Locator) -> str:
+async def extract_all_text_from_banner(banner_locator: Locator, pre_text: Optional[str] = None) -> str:
     """
     Extrait TOUT le texte du banner, y compris sections cachées/accordéons.
 
     Cette fonction tente d'expandre tous les éléments collapsibles pour
-    extraire le texte caché qui n'est pas visible initialement.
+    extraire le texte caché qui n'est pas visible initialement. L'expansion
+    est sautée si le texte initial est déjà long ou s'il n'y a rien à ouvrir.
 
     Args:
         banner_locator: Locator vers la bannière
+        pre_text: Texte déjà lu avant expansion (relu si absent)
 
     Returns:
         Texte complet extrait (ou chaîne vide si échec)
     """
     try:
+        if pre_text is None:
+            pre_text = await banner_locator.inner_text(timeout=3000)
+
+        # Texte déjà complet : les accordéons sont le plus souvent décoratifs
+        if len(pre_text) > BANNER_TEXT_EXPAND_THRESHOLD:
+            return pre_text
+
         # Cliquer sur tous les éléments expandables pour révéler texte caché
         expandables = await banner_locator.locator("[aria-expanded='false']").all()
+        if not expandables:
+            return pre_text
 
-        for elem in expandables[:10]:  # Limite à 10 pour éviter boucles infinies
-            try:
-                await elem.click(timeout=500)
-                await banner_locator.page.wait_for_timeout(200)
-            except:
-                # Continuer même si un clic échoue
-                pass
+        # Limite à 10 pour éviter boucles infinies. Les accordéons sont
+        # indépendants : clics lancés ensemble (un clic qui échoue n'arrête
+        # pas les autres), puis une seule attente dans le frame de la
+        # bannière, levée dès que son texte change (400 ms au plus)
+        await asyncio.gather(*[elem.click(timeout=500) for elem in expandables[:10]], return_exceptions=True)
+        if not await banner_locator.evaluate(WAIT_TEXT_CHANGE_JS, [pre_text, 400], timeout=1000):
+            logging.debug("Banner text unchanged after expand clicks")
 
         # Extraire tout le texte après expansion
         full_text = await banner_locator.inner_text(timeout=3000)
-        return full_text
+        return full_text if len(full_text) > len(pre_text) else pre_text
 
     except Exception as e:
         logging.debug(f"extract_all_text_from_banner failed: {e}")
-        return ""
+        return pre_text or ""
 
 
 def clean_text(text: Optional[str]) -> str:
     """Clean text by removing HTML tags and normalizing whitespace while preserving structure."""
     if not text:
         return ""
-    import re
-    
-    # Replace block tags with newlines to preserve structure
-    text = re.sub(r'<(br|div|p|h\d|li|tr)[^>]*>', '\n', text, flags=re.IGNORECASE)
-    text = re.sub(r'</(div|p|h\d|li|tr)>', '\n', text, flags=re.IGNORECASE)
+
+    # Replace block tags (opening and closing) with newlines to preserve structure
+    text = _BLOCK_TAG_RE.sub('\n', text)
     
     # Remove HTML tags
-    text = re.sub(r'<[^>]+>', ' ', text)
+    text = _HTML_TAG_RE.sub(' ', text)
     
     # Remove CSS styles in text (rare but happens)
-    text = re.sub(r'{[^}]+}', '', text)
+    text = _CSS_BLOCK_RE.sub('', text)
     
-    # Normalize whitespace: replace multiple spaces with single space, but preserve newlines
-    lines = []
-    for line in text.split('\n'):
-        clean_line = re.sub(r'\s+', ' ', line).strip()
-        if clean_line:
-            lines.append(clean_line)
-            
-    return '\n'.join(lines)
+    # Normalize whitespace: replace multiple spaces with single space, but
+    # preserve newlines (one pass over the whole text), then drop empty lines
+    text = _INLINE_WHITESPACE_RE.sub(' ', text)
+    return '\n'.join([line for line in (raw.strip() for raw in text.split('\n')) if line])
 
 
 async def extract_banner_info_safe(banner_locator: Locator, cmp_info: Optional[dict], detection_method: str) -> Optional[BannerInfo]:
@@ -830,18 +1023,23 @@ async def extract_banner_info_safe(banner_locator: Locator, cmp_info: Optional[d
         if not await banner_locator.is_visible(timeout=1000):
             return None
 
-        # Extraction HTML/texte avec timeout généreux
-        banner_html = await banner_locator.inner_html(timeout=5000)
-        banner_text = await banner_locator.inner_text(timeout=5000)
+        # Extraction HTML/texte (timeout généreux)
+        banner_html, banner_text = await banner_locator.evaluate(READ_BANNER_CONTENT_JS, 20000, timeout=5000)
 
         # NOUVEAU : Tenter d'extraire texte de sections cachées/accordéons
-        expanded_text = await extract_all_text_from_banner(banner_locator)
+        # (après la lecture du HTML, car les clics modifient le DOM)
+        expanded_text = await extract_all_text_from_banner(banner_locator, banner_text)
         if len(expanded_text) > len(banner_text):
             logging.debug(f"Expanded text is longer ({len(expanded_text)} vs {len(banner_text)} chars)")
             banner_text = expanded_text
 
-        # Extraire boutons
-        buttons = await extract_banner_buttons(banner_locator)
+        # Boutons lus après l'expansion : ceux des sections repliées sont
+        # alors visibles
+        try:
+            buttons = await extract_banner_buttons(banner_locator)
+        except Exception as e:
+            logging.debug(f"Button extraction failed: {e}")
+            buttons = []
 
         # Validation souple : au moins DU TEXTE ou des boutons
         if len(buttons) == 0 and len(banner_text.strip()) < 20:
@@ -852,8 +1050,8 @@ async def extract_banner_info_safe(banner_locator: Locator, cmp_info: Optional[d
             detected=True,
             cmp_type=cmp_info.get("id") if cmp_info else None,
             cmp_brand=cmp_info.get("brand") if cmp_info else None,
-            banner_html=banner_html[:20000],  # Augmenté à 20k
-            banner_text=clean_text(banner_text),
+            banner_html=banner_html,  # Tronqué à 20k dans le navigateur
+            banner_text=clean_text(banner_text[:20000]),  # Même limite que le HTML
             buttons=buttons,
             detection_method=detection_method,
         )
@@ -886,31 +1084,38 @@ async def extract_banner_info(banner_locator: Locator, cmp_info: Optional[dict],
         logging.debug(f"Banner visibility check failed: {e}")
         return None
 
-    # 2. Try extraction with generous timeout and retry on failure
+    # 2. Try extraction with generous timeout and retry on failure. Buttons
+    # are extracted meanwhile, the reads are independent
     banner_html = None
     banner_text = None
+    buttons_task = asyncio.ensure_future(extract_banner_buttons(banner_locator))
+    try:
+        for attempt in range(2):
+            try:
+                timeout_ms = 5000 if attempt == 0 else 8000
+                logging.debug(f"Extraction attempt {attempt + 1} with {timeout_ms}ms timeout")
 
-    for attempt in range(2):
-        try:
-            timeout_ms = 5000 if attempt == 0 else 8000
-            logging.debug(f"Extraction attempt {attempt + 1} with {timeout_ms}ms timeout")
-
-            banner_html = await banner_locator.inner_html(timeout=timeout_ms)
-            banner_text = await banner_locator.inner_text(timeout=timeout_ms)
+                banner_html, banner_text = await banner_locator.evaluate(
+                    READ_BANNER_CONTENT_JS, 10000, timeout=timeout_ms
+                )
 
-            # Success - break out of retry loop
-            break
+                # Success - break out of retry loop
+                break
 
-        except Exception as e:
-            if attempt == 0:
-                logging.debug(f"Extraction timeout on attempt {attempt + 1}: {e}, retrying...")
-                await asyncio.sleep(0.5)
-            else:
-                logging.warning(f"Extraction failed after {attempt + 1} attempts: {e}")
-                return None
+            except Exception as e:
+                if attempt == 0:
+                    logging.debug(f"Extraction timeout on attempt {attempt + 1}: {e}, retrying...")
+                    await asyncio.sleep(0.5)
+                else:
+                    logging.warning(f"Extraction failed after {attempt + 1} attempts: {e}")
+                    return None
 
-    # 3. Extract buttons
-    buttons = await extract_banner_buttons(banner_locator)
+        # 3. Extract buttons
+        buttons = await buttons_task
+    finally:
+        # Not left running when the extraction fails or is cancelled
+        if not buttons_task.done():
+            buttons_task.cancel()
 
     # 4. Validate: at least SOME content (HTML or text or buttons)
     if not banner_html and not banner_text and len(buttons) == 0:
@@ -921,8 +1126,8 @@ async def extract_banner_info(banner_locator: Locator, cmp_info: Optional[dict],
         detected=True,
         cmp_type=cmp_info.get("id") if cmp_info else None,
         cmp_brand=cmp_info.get("brand") if cmp_info else None,
-        banner_html=banner_html[:10000] if banner_html else "",
-        banner_text=clean_text(banner_text[:10000]) if banner_text else "",
+        banner_html=banner_html or "",
+        banner_text=clean_text(banner_text),
         buttons=buttons,
         detection_method=detection_method,
     )
@@ -930,88 +1135,106 @@ async def extract_banner_info(banner_locator: Locator, cmp_info: Optional[dict],
     return banner_info
 
 
-async def extract_button_selector(btn_locator: Locator) -> str:
-    """
-    Extrait un sélecteur unique et robuste pour un bouton.
-
-    Stratégie hiérarchique :
-    1. ID unique → #id
-    2. Classes sémantiques → .semantic-class
-    3. Aria-label unique → [aria-label="..."]
-    4. Combinaison classe + texte → .class:has-text("...")
-    5. Tag générique → button
-
-    Args:
-        btn_locator: Locator du bouton
-
-    Returns:
-        Sélecteur CSS robuste
-    """
-    try:
-        selector_info = await btn_locator.evaluate("""
-            (el) => {
-                // 1. ID unique (meilleur cas)
-                if (el.id && el.id.length > 0) {
-                    return {type: 'id', value: el.id};
-                }
-
-                // 2. Classes sémantiques (priorité haute)
-                const classes = el.className.split(' ').filter(c => c && c.length > 0);
-                const semanticPatterns = [
-                    'button', 'btn', 'manage', 'settings', 'configure',
-                    'option', 'choice', 'action', 'accept', 'reject',
-                    'consent', 'cookie', 'preference', 'type_'
-                ];
-
-                const semanticClasses = classes.filter(c =>
-                    semanticPatterns.some(pattern => c.toLowerCase().includes(pattern))
-                );
-
-                if (semanticClasses.length > 0) {
-                    // Prendre la classe la plus spécifique (la plus longue)
-                    const bestClass = semanticClasses.sort((a, b) => b.length - a.length)[0];
-                    return {type: 'class', value: bestClass};
-                }
-
-                // 3. Aria-label unique
-                const ariaLabel = el.getAttribute('aria-label');
-                if (ariaLabel && ariaLabel.length > 0 && ariaLabel.length < 100) {
-                    return {type: 'aria-label', value: ariaLabel};
-                }
-
-                // 4. Première classe + texte partiel
-                if (classes.length > 0) {
-                    const text = el.innerText?.trim() || '';
-                    if (text.length > 0 && text.length < 50) {
-                        return {
-                            type: 'class-text',
-                            className: classes[0],
-                            text: text.substring(0, 20)
-                        };
-                    }
-                    return {type: 'class', value: classes[0]};
-                }
-
-                // 5. Fallback tag
-                return {type: 'tag', value: el.tagName.toLowerCase()};
+# Describes how to build a robust selector for a button (see
+# format_button_selector)
+BUTTON_SELECTOR_INFO_JS = """const buttonSelectorInfo = (el) => {
+        // 1. ID unique (meilleur cas)
+        if (el.id && el.id.length > 0) {
+            return {type: 'id', value: el.id};
+        }
+
+        // 2. Classes sémantiques (priorité haute)
+        // className n'est pas une chaîne sur les éléments SVG
+        const className = typeof el.className === 'string' ? el.className : (el.getAttribute('class') || '');
+        const classes = className.split(' ').filter(c => c && c.length > 0);
+        const semanticPatterns = [
+            'button', 'btn', 'manage', 'settings', 'configure',
+            'option', 'choice', 'action', 'accept', 'reject',
+            'consent', 'cookie', 'preference', 'type_'
+        ];
+
+        const semanticClasses = classes.filter(c =>
+            semanticPatterns.some(pattern => c.toLowerCase().includes(pattern))
+        );
+
+        if (semanticClasses.length > 0) {
+            // Prendre la classe la plus spécifique (la plus longue)
+            const bestClass = semanticClasses.sort((a, b) => b.length - a.length)[0];
+            return {type: 'class', value: bestClass};
+        }
+
+        // 3. Aria-label unique
+        const ariaLabel = el.getAttribute('aria-label');
+        if (ariaLabel && ariaLabel.length > 0 && ariaLabel.length < 100) {
+            return {type: 'aria-label', value: ariaLabel};
+        }
+
+        // 4. Première classe + texte partiel
+        if (classes.length > 0) {
+            const text = el.innerText?.trim() || '';
+            if (text.length > 0 && text.length < 50) {
+                return {
+                    type: 'class-text',
+                    className: classes[0],
+                    text: text.substring(0, 20)
+                };
             }
-        """)
+            return {type: 'class', value: classes[0]};
+        }
+
+        // 5. Fallback tag
+        return {type: 'tag', value: el.tagName.toLowerCase()};
+    };"""
+
+# Text (trimmed, lowercase), aria-label, visibility, selector and role of
+# every button of a banner, in one pass. Roles follow classify_button_role,
+# with BUTTON_ROLE_PATTERNS and _ACCEPT_ALL_EXCLUSIONS passed as argument so
+# that both use the same rules
+FIND_BANNER_BUTTONS_JS = """
+(root, [rolePatterns, acceptExclusions, maxButtons]) => {
+    """ + IS_VISIBLE_JS + """
+
+    """ + BUTTON_SELECTOR_INFO_JS + """
+
+    const classify = (combined) => {
+        for (const [role, patterns] of rolePatterns) {
+            if (!patterns.some(pattern => combined.includes(pattern))) continue;
+            // Make sure it's not "accept necessary" or similar
+            if (role === 'accept_all' && acceptExclusions.some(word => combined.includes(word))) continue;
+            return role;
+        }
+        return 'unknown';
+    };
+
+    // Bounded so that a misdetected container (footer, full page) stays cheap
+    const elements = Array.from(root.querySelectorAll('button, a[role="button"], a[href]')).slice(0, maxButtons);
+    return elements.map(el => {
+        const text = (el.innerText || '').trim().toLowerCase();
+        const ariaLabel = el.getAttribute('aria-label');
+        return {
+            text,
+            ariaLabel,
+            visible: isVisible(el),
+            selectorInfo: buttonSelectorInfo(el),
+            role: classify(text + ' ' + (ariaLabel || '').toLowerCase()),
+        };
+    });
+}
+"""
 
-        # Construire le sélecteur basé sur le type
-        if selector_info['type'] == 'id':
-            return f"#{selector_info['value']}"
-        elif selector_info['type'] == 'class':
-            return f".{selector_info['value']}"
-        elif selector_info['type'] == 'aria-label':
-            return f"[aria-label='{selector_info['value']}']"
-        elif selector_info['type'] == 'class-text':
-            return f".{selector_info['className']}:has-text('{selector_info['text']}')"
-        else:
-            return selector_info['value']
-    except Exception as e:
-        logging.debug(f"Error in extract_button_selector: {e}")
-        # Fallback simple
-        return "button"
+
+def format_button_selector(selector_info: dict) -> str:
+    """Build the selector described by BUTTON_SELECTOR_INFO_JS."""
+    if selector_info['type'] == 'id':
+        return f"#{selector_info['value']}"
+    elif selector_info['type'] == 'class':
+        return f".{selector_info['value']}"
+    elif selector_info['type'] == 'aria-label':
+        return f"[aria-label='{selector_info['value']}']"
+    elif selector_info['type'] == 'class-text':
+        return f".{selector_info['className']}:has-text('{selector_info['text']}')"
+    else:
+        return selector_info['value']
 
 
 async def extract_banner_buttons(banner_locator: Locator) -> List[ButtonInfo]:
@@ -1034,31 +1257,23 @@ async def extract_banner_buttons(banner_locator: Locator) -> List[ButtonInfo]:
     buttons = []
 
     try:
-        # Find all interactive elements
-        button_locators = await banner_locator.locator("button, a[role='button'], a[href]").all()
+        # All interactive elements are read and classified in a single evaluate
+        elements = await banner_locator.evaluate(
+            FIND_BANNER_BUTTONS_JS, [BUTTON_ROLE_PATTERNS, _ACCEPT_ALL_EXCLUSIONS, MAX_BANNER_BUTTONS]
+        )
 
-        for btn_locator in button_locators:
+        for element in elements:
             try:
-                text = await btn_locator.inner_text(timeout=500)
-                text = text.strip().lower() if text else ""
-
-                aria_label = await btn_locator.get_attribute("aria-label", timeout=500)
-                aria_label_lower = aria_label.lower() if aria_label else ""
-
-                is_visible = await btn_locator.is_visible(timeout=500)
-
-                # Get a unique selector using improved extraction
-                selector = await extract_button_selector(btn_locator)
-
-                # Classify button role
-                role = classify_button_role(text, aria_label_lower)
+                text = element["text"]
+                aria_label = element["ariaLabel"]
+                selector = format_button_selector(element["selectorInfo"])
 
                 buttons.append(ButtonInfo(
                     text=text[:200],  # Limit size
-                    role=role,
+                    role=element["role"],
                     selector=selector[:200],
                     aria_label=aria_label[:200] if aria_label else None,
-                    is_visible=is_visible,
+                    is_visible=element["visible"],
                 ))
 
             except Exception as e:
@@ -1075,6 +1290,11 @@ def classify_button_role(text: str, aria_label: str) -> str:
     """
     Classify button role based on text and aria-label.
 
+    Same rule as the classify() of FIND_BANNER_BUTTONS_JS, which gets
+    BUTTON_ROLE_PATTERNS and _ACCEPT_ALL_EXCLUSIONS as argument: the first
+    role with a matching pattern wins, accept_all being skipped for
+    "accept necessary" and similar.
+
     Args:
         text: Button text (lowercase)
         aria_label: Button aria-label (lowercase)
@@ -1084,45 +1304,12 @@ def classify_button_role(text: str, aria_label: str) -> str:
     """
     combined = text + " " + aria_label
 
-    # Accept patterns
-    accept_patterns = [
-        "accept all", "accept", "agree", "allow all", "allow",
-        "accepter tout", "accepter", "j'accepte", "tout accepter",
-        "akzeptieren", "alle akzeptieren", "aceptar"
-    ]
-    if any(pattern in combined for pattern in accept_patterns):
-        # Make sure it's not "accept necessary" or similar
-        if "necessary" not in combined and "essential" not in combined:
-            return "accept_all"
-
-    # Reject patterns
-    reject_patterns = [
-        "reject all", "reject", "refuse", "deny",
-        "refuser tout", "refuser", "tout refuser",
-        "ablehnen", "alles ablehnen", "rechazar"
-    ]
-    if any(pattern in combined for pattern in reject_patterns):
-        return "reject_all"
-
-    # Settings patterns
-    settings_patterns = [
-        "setting", "manage", "customize", "configure", "preference", "choice", "choose", "option",
-        "paramétrer", "gérer", "personnaliser", "configurer", "préférence",
-        "einstellung", "verwalten", "anpassen",
-        "configurar", "gestionar", "set up", "partners", "partenaires"
-    ]
-    if any(pattern in combined for pattern in settings_patterns):
-        return "settings"
-
-    # Info patterns
-    info_patterns = [
-        "more info", "learn more", "privacy policy", "cookie policy", "details",
-        "plus d'info", "en savoir plus", "politique",
-        "mehr erfahren", "datenschutz",
-        "más información", "política"
-    ]
-    if any(pattern in combined for pattern in info_patterns):
-        return "info"
+    for role, patterns in BUTTON_ROLE_PATTERNS:
+        if not any(pattern in combined for pattern in patterns):
+            continue
+        if role == "accept_all" and any(word in combined for word in _ACCEPT_ALL_EXCLUSIONS):
+            continue
+        return role
 
     return "unknown"
 
@@ -1146,33 +1333,48 @@ async def search_in_iframes(page: Page, detector_func, max_depth: int = 2, curre
         return None
 
     try:
-        # Handle both Page and Frame objects
+        # Handle both Page and Frame objects. Page.frames already lists the
+        # nested frames, only Frame inputs need the recursion below
         if hasattr(page, "frames"):
-            frames = page.frames
+            frames = [frame for frame in page.frames if frame != page.main_frame]
         else:
             frames = page.child_frames
-        for frame in frames:
-            # Skip the main frame
-            if frame == page.main_frame:
-                continue
 
-            try:
-                # Try detection in this frame
-                banner_info = await detector_func(frame)
+        # Frames are independent: probe them concurrently (bounded), then read
+        # the results in frame order so that the first frame with a banner
+        # wins; the searches still running at that point are cancelled
+        semaphore = asyncio.Semaphore(IFRAME_SEARCH_CONCURRENCY)
+
+        async def search_frame(frame) -> Optional[BannerInfo]:
+            async with semaphore:
+                return await detector_func(frame)
+
+        tasks = [asyncio.ensure_future(search_frame(frame)) for frame in frames]
+        try:
+            for frame, task in zip(frames, tasks):
+                try:
+                    banner_info = await task
+                except Exception as e:
+                    logging.debug(f"Error searching frame {frame.url}: {e}")
+                    continue
                 if banner_info and banner_info.detected:
                     banner_info.in_iframe = True
                     banner_info.iframe_src = frame.url
                     return banner_info
-
-                # Recursively search nested frames
+        finally:
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        # Recursively search nested frames
+        if not hasattr(page, "frames"):
+            for frame in frames:
                 nested_banner = await search_in_iframes(frame, detector_func, max_depth, current_depth + 1)
                 if nested_banner:
                     return nested_banner
 
-            except Exception as e:
-                logging.debug(f"Error searching frame {frame.url}: {e}")
-                continue
-
     except Exception as e:
         logging.warning(f"Error accessing frames: {e}")
 
@@ -1183,7 +1385,8 @@ async def search_in_shadow_dom(page: Page) -> Optional[BannerInfo]:
     """
     Search for banners in Shadow DOM.
 
-    Injects a script to enumerate shadow roots and search for cookie/consent keywords.
+    Injects a script to enumerate shadow roots (nested ones and those of
+    same-origin iframes included) and search for cookie/consent keywords.
 
     Args:
         page: Playwright Page object
@@ -1192,33 +1395,49 @@ async def search_in_shadow_dom(page: Page) -> Optional[BannerInfo]:
         BannerInfo if found, None otherwise
     """
     try:
-        # Inject script to find shadow roots with cookie/consent content
+        # Inject script to find shadow roots with cookie/consent content. One
+        # walk covers nested shadow roots and same-origin iframes; cross-origin
+        # frames are left to search_in_iframes
         shadow_info = await page.evaluate("""
             () => {
-                const results = [];
-                document.querySelectorAll('*').forEach(el => {
-                    if (el.shadowRoot) {
-                        const shadowHTML = el.shadowRoot.innerHTML;
-                        const shadowText = el.shadowRoot.textContent || '';
-
-                        const keywords = ['cookie', 'consent', 'privacy', 'confidentialité'];
-                        const hasKeyword = keywords.some(kw =>
-                            shadowHTML.toLowerCase().includes(kw) ||
-                            shadowText.toLowerCase().includes(kw)
-                        );
-
-                        if (hasKeyword && shadowText.length > 20) {
-                            results.push({
-                                hostTag: el.tagName.toLowerCase(),
-                                hostId: el.id,
-                                hostClass: el.className,
-                                html: shadowHTML.substring(0, 10000),
-                                text: shadowText.substring(0, 5000),
-                            });
+                // One precompiled case-insensitive test, no lowercased copies
+                const keywordRe = /cookie|consent|privacy|confidentialité/i;
+
+                const visit = (root, depth) => {
+                    const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT);
+                    for (let el = walker.nextNode(); el; el = walker.nextNode()) {
+                        if (el.shadowRoot) {
+                            const shadowText = el.shadowRoot.textContent || '';
+                            if (shadowText.length > 20) {
+                                if (keywordRe.test(shadowText) || keywordRe.test(el.shadowRoot.innerHTML)) {
+                                    return {
+                                        hostTag: el.tagName.toLowerCase(),
+                                        hostId: el.id,
+                                        hostClass: el.className,
+                                        html: el.shadowRoot.innerHTML.substring(0, 10000),
+                                        text: shadowText.substring(0, 5000),
+                                        inIframe: depth > 0,
+                                    };
+                                }
+                            }
+                            const nested = visit(el.shadowRoot, depth);
+                            if (nested) return nested;
+                        }
+                        if (el.tagName === 'IFRAME' && depth < 2) {
+                            let doc = null;
+                            try {
+                                doc = el.contentDocument;
+                            } catch (e) {}
+                            if (doc && doc.documentElement) {
+                                const found = visit(doc.documentElement, depth + 1);
+                                if (found) return found;
+                            }
                         }
                     }
-                });
-                return results.length > 0 ? results[0] : null;
+                    return null;
+                };
+
+                return document.documentElement ? visit(document.documentElement, 0) : null;
             }
         """)
 
@@ -1230,6 +1449,7 @@ async def search_in_shadow_dom(page: Page) -> Optional[BannerInfo]:
                 banner_html=shadow_info.get("html", ""),
                 banner_text=shadow_info.get("text", ""),
                 in_shadow_dom=True,
+                in_iframe=bool(shadow_info.get("inIframe")),
                 detection_method="shadow_dom",
                 buttons=[],  # Shadow DOM button extraction would require more complex logic
             )
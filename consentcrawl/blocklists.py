@@ -10,6 +10,20 @@ import sqlite3
 MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
+def blocklists_stale(last_fetch_timestamp: float, max_age_days: int = 7) -> bool:
+    """
+    Whether blocklists fetched at last_fetch_timestamp should be fetched again.
+
+    Ages are counted in whole days: data is stale once it is more than
+    max_age_days full days old.
+    """
+    age_in_days = int((int(time()) - int(last_fetch_timestamp)) / (60 * 60 * 24))
+    logging.debug(
+        f"Bootstrap data age in days: {age_in_days} ( > {max_age_days} = {age_in_days > max_age_days})"
+    )
+    return age_in_days > max_age_days
+
+
 class Blocklists:
     BLOCKLISTS_FILE = f"{MODULE_DIR}/assets/blocklists.yml"
     DB_FILE = f"{MODULE_DIR}/data/blocklists.db"
@@ -89,13 +103,14 @@ class Blocklists:
 
         return conn
 
+    def close(self):
+        """
+        Close the SQLite connection.
+        """
+        self.connection.close()
+
     def blocklists_older_than(self, days: int = 7):
-        age_in_seconds = int(time()) - self.last_fetch_timestamp
-        age_in_days = int(age_in_seconds / (60 * 60 * 24))
-        logging.debug(
-            f"Bootstrap data age in days: {age_in_days} ( > {days} = {age_in_days > days})"
-        )
-        return age_in_days > days
+        return blocklists_stale(self.last_fetch_timestamp, days)
 
     def get_blocklists_file(self):
         """
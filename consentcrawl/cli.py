@@ -111,19 +111,19 @@ def cli():
 
     # List of URLs to test
     if args.url.endswith(".txt"):
+        # Streamed and deduplicated in file order (dict keys keep insertion
+        # order), without keeping a copy of the raw lines
         with open(args.url, "r") as f:
-            urls = list(
-                set(
-                    [
-                        l.strip().lower()
-                        for l in set(f.readlines())
-                        if len(l) > 0 and not l.startswith("#")
-                    ]
+            urls = tuple(
+                dict.fromkeys(
+                    l
+                    for l in (raw.strip().lower() for raw in f)
+                    if l and not l.startswith("#")
                 )
             )
 
     elif args.url != "":
-        urls = args.url.split(",")
+        urls = tuple(args.url.split(","))
     else:
         logging.error("No URL or valid .txt file with URLs to test")
 
@@ -150,10 +150,11 @@ def cli():
                 results_db_file=args.db_file,
                 output_dir=args.output_dir,
                 screenshot=args.screenshot,
+                collect_results=args.show_output and len(urls) < 25,
             )
         )
 
-        if args.show_output and len(results) < 25:
+        if results:
             sys.stdout.write(json.dumps(results, indent=2))
 
     else:
@@ -5,10 +5,256 @@ These functions handle iframe-based and shadow DOM CMPs that require
 special detection logic beyond generic selectors.
 """
 
+import asyncio
 import logging
-from typing import Optional
+import time
+import weakref
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 from playwright.async_api import Page, Locator, Frame
 
+from consentcrawl.constants import FRAME_CLASSIFICATION_TTL
+
+
+# Lowercase substrings of a frame URL / name telling which CMP it belongs to
+_CMP_FRAME_URL_TOKENS = {
+    "sourcepoint": ("sourcepoint", "sp-prod.net", "privacy-mgmt"),
+    "onetrust": ("onetrust", "cookielaw"),
+    "didomi": ("didomi",),
+    "trust_commander": ("privacy-center",),
+}
+_CMP_FRAME_NAME_TOKENS = {
+    "sourcepoint": ("sp_message_iframe",),
+    "onetrust": ("ot-",),
+    "didomi": ("didomi",),
+    "trust_commander": ("privacy-iframe",),
+}
+
+# Classification per page or frame: (time, frames snapshot by CMP). The
+# cached frames reference their page, which would keep the weak key alive, so
+# entries are also dropped when their page closes
+_classified_frames_cache = weakref.WeakKeyDictionary()
+
+
+def _classify_frames(page: Union[Page, Frame]) -> Dict[str, List[Frame]]:
+    """
+    Sort the frames of a page by CMP in one pass, each URL and name being
+    lowercased once.
+
+    The result is shared by the detectors run on the same page or frame for
+    FRAME_CLASSIFICATION_TTL ms, frames attached or navigated meanwhile being
+    picked up on the next classification. It must not be mutated.
+
+    Args:
+        page: Playwright Page (all frames) or Frame (its child frames)
+
+    Returns:
+        Frames per CMP key of _CMP_FRAME_URL_TOKENS, in page order
+    """
+    now = time.monotonic()
+    cached = _classified_frames_cache.get(page)
+    if cached and (now - cached[0]) * 1000 < FRAME_CLASSIFICATION_TTL:
+        return cached[1]
+
+    frames = getattr(page, 'frames', None)
+    if frames is None:
+        frames = getattr(page, 'child_frames', [])
+
+    classified = {cmp_name: [] for cmp_name in _CMP_FRAME_URL_TOKENS}
+    for frame in frames:
+        url = (frame.url or "").lower()
+        name = (frame.name or "").lower()
+        for cmp_name, url_tokens in _CMP_FRAME_URL_TOKENS.items():
+            if any(token in url for token in url_tokens) or any(token in name for token in _CMP_FRAME_NAME_TOKENS[cmp_name]):
+                classified[cmp_name].append(frame)
+
+    if cached is None:
+        owner = page if isinstance(page, Page) else page.page
+        owner.once("close", lambda _: _classified_frames_cache.pop(page, None))
+    _classified_frames_cache[page] = (now, classified)
+    return classified
+
+
+# Visibility check of the in-page probes, close to Playwright's is_visible()
+_IS_VISIBLE_JS = """const isVisible = (el) => {
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== 'hidden';
+    };"""
+
+# querySelector that also looks into open shadow roots, like Playwright's CSS
+# engine. The shadow roots are collected once, on the first miss
+_QUERY_DEEP_JS = """let shadowRoots = null;
+    const collectShadowRoots = (root, out) => {
+        const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT);
+        for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+            if (node.shadowRoot) {
+                out.push(node.shadowRoot);
+                collectShadowRoots(node.shadowRoot, out);
+            }
+        }
+        return out;
+    };
+    const queryDeep = (selector) => {
+        const el = document.querySelector(selector);
+        if (el !== null) return el;
+        if (shadowRoots === null) shadowRoots = collectShadowRoots(document, []);
+        for (const root of shadowRoots) {
+            const found = root.querySelector(selector);
+            if (found !== null) return found;
+        }
+        return null;
+    };"""
+
+# Index of the first selector whose first match is visible (-1 if none).
+# Selectors the browser cannot parse are skipped. With waitMs > 0 and nothing
+# visible yet, DOM mutations (in the document and in the open shadow roots,
+# including those added meanwhile) are watched for up to waitMs so that a
+# modal still being inserted is caught without polling from Python
+FIRST_VISIBLE_JS = """
+([selectors, waitMs]) => {
+    """ + _IS_VISIBLE_JS + """
+
+    """ + _QUERY_DEEP_JS + """
+
+    const firstVisible = () => selectors.findIndex(selector => {
+        try {
+            const el = queryDeep(selector);
+            return el !== null && isVisible(el);
+        } catch (e) {
+            return false;
+        }
+    });
+
+    const index = firstVisible();
+    if (index >= 0 || waitMs <= 0) return index;
+
+    if (shadowRoots === null) shadowRoots = collectShadowRoots(document, []);
+    const options = {childList: true, subtree: true, attributes: true};
+    return new Promise(resolve => {
+        let done = false;
+        let scheduled = false;
+        const finish = (result) => {
+            if (done) return;
+            done = true;
+            observer.disconnect();
+            clearTimeout(timer);
+            resolve(result);
+        };
+        // Only the added subtrees are walked for new shadow roots, and the
+        // selectors re-checked at most every 10 ms, however many mutations happen
+        const observer = new MutationObserver(records => {
+            for (const record of records) {
+                for (const node of record.addedNodes) {
+                    if (node.nodeType !== Node.ELEMENT_NODE) continue;
+                    const roots = [];
+                    if (node.shadowRoot) {
+                        roots.push(node.shadowRoot);
+                        collectShadowRoots(node.shadowRoot, roots);
+                    }
+                    collectShadowRoots(node, roots);
+                    for (const root of roots) {
+                        if (shadowRoots.includes(root)) continue;
+                        shadowRoots.push(root);
+                        observer.observe(root, options);
+                    }
+                }
+            }
+            if (scheduled) return;
+            scheduled = true;
+            setTimeout(() => {
+                scheduled = false;
+                const found = firstVisible();
+                if (found >= 0) finish(found);
+            }, 10);
+        });
+        observer.observe(document, options);
+        for (const root of shadowRoots) observer.observe(root, options);
+        // Last check with a fresh walk, for roots attached to hosts already in place
+        const timer = setTimeout(() => {
+            shadowRoots = null;
+            finish(firstVisible());
+        }, waitMs);
+    });
+}
+"""
+
+
+async def _first_visible(scope: Union[Page, Frame], selectors: Sequence[str], wait_ms: int = 0) -> Optional[Tuple[str, Locator]]:
+    """
+    Return the first visible match among selectors.
+
+    All selectors are tested in one evaluate, in priority order (a CSS union
+    would pick the first match in document order instead). With wait_ms, if
+    none is visible, the page waits up to wait_ms for one to appear, reacting
+    to DOM mutations; this is meant for probes right after a click. If the
+    evaluate fails, the selectors are probed concurrently with is_visible().
+
+    Args:
+        scope: Page or Frame to search in
+        selectors: Candidate CSS selectors, by priority
+        wait_ms: Time allowed for a match to appear (ms), 0 for a plain probe
+
+    Returns:
+        (selector, locator) of the first visible match, None otherwise
+    """
+    try:
+        index = await scope.evaluate(FIRST_VISIBLE_JS, [list(selectors), wait_ms])
+        return (selectors[index], scope.locator(selectors[index]).first) if index >= 0 else None
+    except Exception as e:
+        logging.debug(f"Visibility probe failed, falling back to locators: {e}")
+
+    locators = [scope.locator(selector).first for selector in selectors]
+    results = await asyncio.gather(
+        *[locator.is_visible(timeout=100) for locator in locators],
+        return_exceptions=True,
+    )
+    for selector, locator, visible in zip(selectors, locators, results):
+        if visible is True:
+            return selector, locator
+    return None
+
+
+# Sourcepoint modal selectors, by priority
+SOURCEPOINT_MODAL_SELECTORS = (
+    ".message-container",
+    "#sp-message-container",
+    "div[class*='message-stack']",
+    "div[class*='sp_choice']",
+    "div[id*='notice']",
+    ".message-overlay",  # Move to end as it might be just a backdrop
+    "body > div",  # Fallback
+)
+
+# Elements telling the Privacy Manager apart from the first-layer banner: PM
+# usually has stacks, tabs, or "Purposes"/"Vendors" buttons
+SOURCEPOINT_PM_SELECTORS = (
+    ".tcfv2-stack",
+    ".message-component.stack-row",
+    ".pm-sub-p",
+)
+SOURCEPOINT_PM_BUTTON_TEXTS = ("purposes", "vendors")
+
+# Index of the first visible modal selector (-1 if none) and whether the frame
+# looks like the Privacy Manager. Button texts are matched like Playwright's
+# :has-text (case-insensitive substring)
+SOURCEPOINT_PROBE_JS = """
+([selectors, pmSelectors, pmButtonTexts]) => {
+    """ + _IS_VISIBLE_JS + """
+
+    const matched = selectors.findIndex(selector => {
+        const el = document.querySelector(selector);
+        return el !== null && isVisible(el);
+    });
+    if (matched < 0) return {matched, isPm: false};
+
+    const isPm = pmSelectors.some(selector => document.querySelector(selector) !== null)
+        || Array.from(document.querySelectorAll('button')).some(button => {
+            const text = (button.textContent || '').toLowerCase();
+            return pmButtonTexts.some(pmText => text.includes(pmText));
+        });
+    return {matched, isPm};
+}
+"""
+
 
 async def detect_sourcepoint_modal(page: Page) -> Optional[Locator]:
     """
@@ -25,13 +271,7 @@ async def detect_sourcepoint_modal(page: Page) -> Optional[Locator]:
     """
     try:
         # Find Sourcepoint iframes
-        sp_frames = [
-            f for f in page.frames 
-            if 'sp_message_iframe' in f.name or 
-               'sourcepoint' in f.url.lower() or
-               'sp-prod.net' in f.url.lower() or
-               'privacy-mgmt' in f.url.lower()
-        ]
+        sp_frames = _classify_frames(page)["sourcepoint"]
         
         logging.debug(f"Found {len(sp_frames)} potential Sourcepoint iframes")
         
@@ -42,46 +282,21 @@ async def detect_sourcepoint_modal(page: Page) -> Optional[Locator]:
         # Check PM frames first
         for frame in pm_frames + other_frames:
             try:
-                # Sourcepoint modal selectors
-                selectors = [
-                    ".message-container",
-                    "#sp-message-container",
-                    "div[class*='message-stack']",
-                    "div[class*='sp_choice']",
-                    "div[id*='notice']",
-                    ".message-overlay", # Move to end as it might be just a backdrop
-                    "body > div",  # Fallback
-                ]
-                
-                for selector in selectors:
-                    locator = frame.locator(selector).first
-                    if await locator.is_visible(timeout=100):
-                        # Verify it's not just the banner (check for PM specific elements)
-                        # PM usually has stacks, tabs, or "Privacy Manager" title
-                        pm_indicators = [
-                            ".tcfv2-stack",
-                            ".message-component.stack-row",
-                            ".pm-sub-p",
-                            "button:has-text('Purposes')",
-                            "button:has-text('Vendors')"
-                        ]
-                        
-                        is_pm = False
-                        for indicator in pm_indicators:
-                            if await frame.locator(indicator).count() > 0:
-                                is_pm = True
-                                break
-                        
-                        if is_pm or "privacy-manager" in frame.url:
-                            logging.info(f"✓ Sourcepoint modal found in iframe {frame.url} with selector: {selector}")
-                            return locator
-                        else:
-                             logging.debug(f"  Ignored potential Sourcepoint modal in {frame.url} (not PM-like)")
-                            
-            except Exception as e:
-                logging.debug(f"Error checking Sourcepoint iframe: {e}")
-                continue
-                            
+                # Visibility of every selector and PM indicators in one evaluate
+                probe = await frame.evaluate(
+                    SOURCEPOINT_PROBE_JS,
+                    [list(SOURCEPOINT_MODAL_SELECTORS), list(SOURCEPOINT_PM_SELECTORS), list(SOURCEPOINT_PM_BUTTON_TEXTS)],
+                )
+                if probe["matched"] < 0:
+                    continue
+                selector = SOURCEPOINT_MODAL_SELECTORS[probe["matched"]]
+
+                if probe["isPm"] or "privacy-manager" in frame.url:
+                    logging.info(f"✓ Sourcepoint modal found in iframe {frame.url} with selector: {selector}")
+                    return frame.locator(selector).first
+                else:
+                    logging.debug(f"  Ignored potential Sourcepoint modal in {frame.url} (not PM-like)")
+
             except Exception as e:
                 logging.debug(f"Error checking Sourcepoint iframe: {e}")
                 continue
@@ -92,7 +307,23 @@ async def detect_sourcepoint_modal(page: Page) -> Optional[Locator]:
     return None
 
 
-async def detect_onetrust_modal(page: Page) -> Optional[Locator]:
+# OneTrust modal injected in the main page, by priority
+ONETRUST_MAIN_SELECTORS = (
+    "#onetrust-pc-sdk",
+    "#ot-pc-content",
+    ".ot-sdk-container",
+    "[class*='onetrust']",
+)
+
+# OneTrust modal inside its iframe, by priority
+ONETRUST_IFRAME_SELECTORS = (
+    "#onetrust-pc-sdk",
+    ".ot-pc-content",
+    "div[role='dialog']",
+)
+
+
+async def detect_onetrust_modal(page: Page, wait_ms: int = 0) -> Optional[Locator]:
     """
     OneTrust-specific modal detection.
     
@@ -101,51 +332,29 @@ async def detect_onetrust_modal(page: Page) -> Optional[Locator]:
     
     Args:
         page: Playwright Page object
+        wait_ms: Time allowed for the modal to appear (ms), after a click
         
     Returns:
         Modal locator if found, None otherwise
     """
     try:
         # Strategy 1: Check main page first (OneTrust often injects directly)
-        main_selectors = [
-            "#onetrust-pc-sdk",
-            "#ot-pc-content",
-            ".ot-sdk-container",
-            "[class*='onetrust']",
-        ]
-        
-        for selector in main_selectors:
-            try:
-                locator = page.locator(selector).first
-                if await locator.is_visible(timeout=100):
-                    logging.info(f"✓ OneTrust modal found in main page: {selector}")
-                    return locator
-            except:
-                continue
+        match = await _first_visible(page, ONETRUST_MAIN_SELECTORS, wait_ms)
+        if match:
+            logging.info(f"✓ OneTrust modal found in main page: {match[0]}")
+            return match[1]
         
         # Strategy 2: Check for OneTrust iframes
-        ot_frames = [
-            f for f in page.frames
-            if 'onetrust' in f.url.lower() or 
-               'cookielaw' in f.url.lower() or
-               'ot-' in f.name.lower()
-        ]
+        ot_frames = _classify_frames(page)["onetrust"]
         
         logging.debug(f"Found {len(ot_frames)} potential OneTrust iframes")
         
         for frame in ot_frames:
             try:
-                iframe_selectors = [
-                    "#onetrust-pc-sdk",
-                    ".ot-pc-content",
-                    "div[role='dialog']",
-                ]
-                
-                for selector in iframe_selectors:
-                    locator = frame.locator(selector).first
-                    if await locator.is_visible(timeout=100):
-                        logging.info(f"✓ OneTrust modal found in iframe: {selector}")
-                        return locator
+                match = await _first_visible(frame, ONETRUST_IFRAME_SELECTORS, wait_ms)
+                if match:
+                    logging.info(f"✓ OneTrust modal found in iframe: {match[0]}")
+                    return match[1]
                         
             except Exception as e:
                 logging.debug(f"Error checking OneTrust iframe: {e}")
@@ -157,7 +366,21 @@ async def detect_onetrust_modal(page: Page) -> Optional[Locator]:
     return None
 
 
-async def detect_didomi_modal(page: Page) -> Optional[Locator]:
+# Didomi preferences modal (priority for UI exploration)
+DIDOMI_PREFERENCES_SELECTORS = (
+    ".didomi-consent-popup-preferences",
+    ".didomi-popup-preferences",
+)
+
+# Didomi notice in the main page, by priority
+DIDOMI_MAIN_SELECTORS = (
+    "#didomi-notice",
+    ".didomi-popup",
+    "[class*='didomi']",
+)
+
+
+async def detect_didomi_modal(page: Page, wait_ms: int = 0) -> Optional[Locator]:
     """
     Didomi-specific modal detection.
     
@@ -166,25 +389,17 @@ async def detect_didomi_modal(page: Page) -> Optional[Locator]:
     
     Args:
         page: Playwright Page object
+        wait_ms: Time allowed for the modal to appear (ms), after a click
         
     Returns:
         Modal locator if found, None otherwise
     """
     try:
         # Strategy 0: Check for preferences modal (Priority for UI exploration)
-        preferences_selectors = [
-            ".didomi-consent-popup-preferences",
-            ".didomi-popup-preferences"
-        ]
-        
-        for selector in preferences_selectors:
-            try:
-                locator = page.locator(selector).first
-                if await locator.is_visible(timeout=100):
-                    logging.info(f"✓ Didomi preferences modal found: {selector}")
-                    return locator
-            except:
-                continue
+        match = await _first_visible(page, DIDOMI_PREFERENCES_SELECTORS, wait_ms)
+        if match:
+            logging.info(f"✓ Didomi preferences modal found: {match[0]}")
+            return match[1]
 
         # Strategy 1: Check shadow DOM
         try:
@@ -193,31 +408,17 @@ async def detect_didomi_modal(page: Page) -> Optional[Locator]:
             if await shadow_modal.is_visible(timeout=100):
                 logging.info("✓ Didomi modal found in shadow DOM")
                 return shadow_modal
-        except:
+        except Exception:
             pass
         
         # Strategy 2: Check main page (Notice modal)
-        main_selectors = [
-            "#didomi-notice",
-            ".didomi-popup",
-            "[class*='didomi']",
-        ]
-        
-        for selector in main_selectors:
-            try:
-                locator = page.locator(selector).first
-                if await locator.is_visible(timeout=100):
-                    logging.info(f"✓ Didomi modal found in main page: {selector}")
-                    return locator
-            except:
-                continue
+        match = await _first_visible(page, DIDOMI_MAIN_SELECTORS, wait_ms)
+        if match:
+            logging.info(f"✓ Didomi modal found in main page: {match[0]}")
+            return match[1]
         
         # Strategy 3: Check iframes
-        frames = getattr(page, 'frames', getattr(page, 'child_frames', []))
-        didomi_frames = [
-            f for f in frames
-            if 'didomi' in f.url.lower() or 'didomi' in f.name.lower()
-        ]
+        didomi_frames = _classify_frames(page)["didomi"]
         
         logging.debug(f"Found {len(didomi_frames)} potential Didomi iframes")
         
@@ -237,7 +438,24 @@ async def detect_didomi_modal(page: Page) -> Optional[Locator]:
     return None
 
 
-async def detect_trust_commander_modal(page: Page) -> Optional[Locator]:
+# Trust Commander Privacy Center content inside its iframe, by priority
+TRUST_COMMANDER_IFRAME_SELECTORS = (
+    ".modal-content",
+    ".modal-body",
+    "[role='dialog']",
+    "body",  # Fallback to iframe body
+)
+
+# Trust Commander banner in the main page, by priority
+TRUST_COMMANDER_MAIN_SELECTORS = (
+    "#footer_tc_privacy",
+    "#tc-privacy-wrapper",
+    ".tc-privacy-banner",
+    "#popin_tc_privacy",
+)
+
+
+async def detect_trust_commander_modal(page: Page, wait_ms: int = 0) -> Optional[Locator]:
     """
     Trust Commander-specific modal detection.
     
@@ -245,52 +463,33 @@ async def detect_trust_commander_modal(page: Page) -> Optional[Locator]:
     
     Args:
         page: Playwright Page object
+        wait_ms: Time allowed for the modal to appear (ms), after a click
         
     Returns:
         Modal locator if found, None otherwise
     """
     try:
         # Strategy 1: Check for Privacy Center iframe FIRST (after clicking settings)
-        frames = getattr(page, 'frames', getattr(page, 'child_frames', []))
-        
-        for frame in frames:
+        for frame in _classify_frames(page)["trust_commander"]:
             try:
-                # Check if this is the Trust Commander privacy center iframe
-                if "privacy-center" in frame.url or "privacy-iframe" in frame.name:
-                    # Look for modal content inside iframe
-                    selectors = [
-                        ".modal-content",
-                        ".modal-body",
-                        "[role='dialog']",
-                        "body"  # Fallback to iframe body
-                    ]
-                    
-                    for selector in selectors:
-                        try:
-                            locator = frame.locator(selector).first
-                            count = await frame.locator(selector).count()
-                            if count > 0:
-                                logging.info(f"✓ Trust Commander Privacy Center found in iframe: {frame.url}")
-                                return locator
-                        except:
-                            continue
-            except:
+                # Look for modal content inside iframe
+                for selector in TRUST_COMMANDER_IFRAME_SELECTORS:
+                    try:
+                        locator = frame.locator(selector).first
+                        count = await frame.locator(selector).count()
+                        if count > 0:
+                            logging.info(f"✓ Trust Commander Privacy Center found in iframe: {frame.url}")
+                            return locator
+                    except Exception:
+                        continue
+            except Exception:
                 continue
-        
+
         # Strategy 2: Fall back to main page banner (initial detection)
-        main_selectors = [
-            "#footer_tc_privacy",
-            "#tc-privacy-wrapper",
-            ".tc-privacy-banner",
-            "#popin_tc_privacy"
-        ]
-        
-        for selector in main_selectors:
-            if await page.locator(selector).count() > 0:
-                locator = page.locator(selector).first
-                if await locator.is_visible():
-                    logging.info(f"✓ Trust Commander banner found in main page: {selector}")
-                    return locator
+        match = await _first_visible(page, TRUST_COMMANDER_MAIN_SELECTORS, wait_ms)
+        if match:
+            logging.info(f"✓ Trust Commander banner found in main page: {match[0]}")
+            return match[1]
                 
     except Exception as e:
         logging.debug(f"Trust Commander detection failed: {e}")
@@ -298,11 +497,39 @@ async def detect_trust_commander_modal(page: Page) -> Optional[Locator]:
     return None
 
 
+# SFBX iframe (srcdoc) and the content looked for inside it, by priority
+SFBX_IFRAME_SELECTOR = "#appconsent > iframe"
+SFBX_SELECTORS = (
+    ".modal__container",
+    ".page__content",
+    ".button__openPrivacyCenter",
+    "body",
+)
+
+# First selector with at least one match in the SFBX iframe: its index, the
+# position of its first visible match (0 if all are hidden) and whether that
+# match is visible. null if no selector matches
+SFBX_PROBE_JS = """
+(root, selectors) => {
+    """ + _IS_VISIBLE_JS + """
+
+    for (let index = 0; index < selectors.length; index++) {
+        const candidates = Array.from(document.querySelectorAll(selectors[index]));
+        if (candidates.length === 0) continue;
+        const visibleAt = candidates.findIndex(isVisible);
+        return {index, nth: Math.max(visibleAt, 0), visible: visibleAt >= 0};
+    }
+    return null;
+}
+"""
+
+
 async def detect_sfbx_modal(page: Page) -> Optional[Locator]:
     """
     SFBX-specific modal detection.
     
-    SFBX uses an iframe (#appconsent > iframe) with srcdoc.
+    SFBX uses an iframe (#appconsent > iframe) with srcdoc. Its content is
+    reached through a FrameLocator and probed in a single evaluate.
     
     Args:
         page: Playwright Page object
@@ -311,37 +538,23 @@ async def detect_sfbx_modal(page: Page) -> Optional[Locator]:
         Modal locator if found, None otherwise
     """
     try:
-        # SFBX iframe selector
-        iframe_selector = "#appconsent > iframe"
-        
-        # Check if iframe exists
-        if await page.locator(iframe_selector).count() > 0:
-            # Get element handle to access content frame
-            element_handle = await page.locator(iframe_selector).element_handle()
-            if element_handle:
-                frame = await element_handle.content_frame()
-                if frame:
-                    # Look for key elements inside iframe
-                    selectors = [
-                        ".modal__container",
-                        ".page__content",
-                        ".button__openPrivacyCenter",
-                        "body"
-                    ]
-                    
-                    for selector in selectors:
-                        try:
-                            candidates = await frame.locator(selector).all()
-                            for candidate in candidates:
-                                if await candidate.is_visible():
-                                    logging.info(f"✓ SFBX modal found and visible in iframe with selector: {selector}")
-                                    return candidate
-                            # If no visible candidate found, but candidates exist, return the first one (fallback)
-                            if candidates:
-                                logging.info(f"✓ SFBX modal found (hidden) in iframe with selector: {selector}")
-                                return candidates[0]
-                        except Exception as e:
-                            logging.debug(f"Error checking SFBX selector {selector}: {e}")
+        # Check if iframe exists (avoids waiting on a missing frame below)
+        if await page.locator(SFBX_IFRAME_SELECTOR).count() == 0:
+            return None
+
+        # Look for key elements inside iframe
+        frame_locator = page.frame_locator(SFBX_IFRAME_SELECTOR).first
+        probe = await frame_locator.locator(":root").evaluate(
+            SFBX_PROBE_JS, list(SFBX_SELECTORS), timeout=1000
+        )
+        if probe:
+            selector = SFBX_SELECTORS[probe["index"]]
+            if probe["visible"]:
+                logging.info(f"✓ SFBX modal found and visible in iframe with selector: {selector}")
+            else:
+                # No visible candidate found, but candidates exist: first one (fallback)
+                logging.info(f"✓ SFBX modal found (hidden) in iframe with selector: {selector}")
+            return frame_locator.locator(selector).nth(probe["nth"])
                             
     except Exception as e:
         logging.debug(f"SFBX detection failed: {e}")
@@ -375,8 +588,21 @@ async def detect_lemonde_wall(page: Page) -> Optional[Locator]:
     return None
 
 
+# Orejime settings modal (after clicking "Personnaliser")
+OREJIME_SETTINGS_SELECTORS = (
+    ".orejime-Modal",  # The settings modal
+    ".orejime-AppList",  # The app list inside settings
+)
+
+# Orejime initial notice (before clicking settings)
+OREJIME_NOTICE_SELECTORS = (
+    ".orejime-Notice",  # The visible notice/modal
+    ".orejime-Modal-form",
+    "[class*='orejime'][class*='Modal']",
+)
+
 
-async def detect_orejime_modal(page: Page) -> Optional[Locator]:
+async def detect_orejime_modal(page: Page, wait_ms: int = 0) -> Optional[Locator]:
     """
     Orejime-specific modal detection.
     
@@ -384,42 +610,30 @@ async def detect_orejime_modal(page: Page) -> Optional[Locator]:
     
     Args:
         page: Playwright Page object
+        wait_ms: Time allowed for the modal to appear (ms), after a click
         
     Returns:
         Modal locator if found, None otherwise
     """
     try:
         # Priority 1: Settings modal (after clicking "Personnaliser")
-        settings_selectors = [
-            ".orejime-Modal",  # The settings modal
-            ".orejime-AppList",  # The app list inside settings
-        ]
-        
-        for selector in settings_selectors:
-            if await page.locator(selector).count() > 0:
-                element = page.locator(selector).first
-                if await element.is_visible():
-                    logging.info(f"✓ Orejime settings modal found with selector: {selector}")
-                    return element
+        match = await _first_visible(page, OREJIME_SETTINGS_SELECTORS, wait_ms)
+        if match:
+            logging.info(f"✓ Orejime settings modal found with selector: {match[0]}")
+            return match[1]
         
         # Priority 2: Initial notice (before clicking settings)
-        notice_selectors = [
-            ".orejime-Notice",  # The visible notice/modal
-            ".orejime-Modal-form",
-            "[class*='orejime'][class*='Modal']",
-        ]
-        
-        for selector in notice_selectors:
-            if await page.locator(selector).count() > 0:
-                # Check if it has content (buttons)
-                element = page.locator(selector).first
-                if await element.is_visible():
-                    logging.info(f"✓ Orejime notice found with selector: {selector}")
-                    return element
-                elif await element.locator("button").count() > 0:
-                     # Even if not visible, if it has buttons, it's likely the right container
-                    logging.info(f"✓ Orejime notice found (hidden but has buttons) with selector: {selector}")
-                    return element
+        match = await _first_visible(page, OREJIME_NOTICE_SELECTORS, wait_ms)
+        if match:
+            logging.info(f"✓ Orejime notice found with selector: {match[0]}")
+            return match[1]
+
+        for selector in OREJIME_NOTICE_SELECTORS:
+            # Even if not visible, if it has buttons, it's likely the right container
+            element = page.locator(selector).first
+            if await element.locator("button").count() > 0:
+                logging.info(f"✓ Orejime notice found (hidden but has buttons) with selector: {selector}")
+                return element
                     
     except Exception as e:
         logging.debug(f"Orejime detection failed: {e}")
@@ -427,12 +641,35 @@ async def detect_orejime_modal(page: Page) -> Optional[Locator]:
     return None
 
 
+# Weighted lowercase substrings of a frame URL / name, used to search the
+# likely CMP frames first when a page has many iframes (ads, embeds)
+_FRAME_SCORE_TOKENS = (
+    ("sp_message_iframe", 10),
+    ("onetrust", 10),
+    ("didomi", 10),
+    ("sfbx", 10),
+    ("appconsent", 9),
+    ("privacy", 5),
+    ("consent", 5),
+    ("cookie", 4),
+)
+
+
+def _frame_score(frame: Frame) -> int:
+    """Score how likely a frame is to hold a consent modal (0 if unrelated)."""
+    info = f"{frame.url or ''} {frame.name or ''}".lower()
+    return sum(weight for token, weight in _FRAME_SCORE_TOKENS if token in info)
+
+
 async def detect_modal_in_all_frames(page: Page, cmp_type: Optional[str], detect_func) -> Optional[Locator]:
     """
     Search for modal in ALL frames (main page + all iframes).
     
     This is a fallback when CMP-specific detection fails.
-    Searches up to 10 frames to avoid performance issues.
+    Searches up to 10 frames to avoid performance issues, those whose URL or
+    name looks CMP-related taking precedence. The frames are
+    searched concurrently; the match in the best-ranked frame wins and the
+    lower-ranked searches are then cancelled.
     
     Args:
         page: Playwright Page object
@@ -443,20 +680,35 @@ async def detect_modal_in_all_frames(page: Page, cmp_type: Optional[str], detect
         Modal locator if found, None otherwise
     """
     try:
-        all_frames = page.frames[:10]  # Limit to 10 frames for performance
+        # Limit to 10 frames for performance, the likely CMP frames first
+        # (stable sort: page order otherwise), then unrelated frames to fill
+        # the remaining slots
+        scores = {frame: _frame_score(frame) for frame in page.frames}
+        ranked = sorted(page.frames, key=scores.__getitem__, reverse=True)
+        all_frames = ranked[:10]
         logging.debug(f"Searching for modal in {len(all_frames)} frames")
-        
-        for i, frame in enumerate(all_frames):
-            try:
-                # Try to detect modal in this frame
-                modal = await detect_func(frame, cmp_type, None)  # Pass None for config
+
+        # Pass None for config. The frames are searched concurrently but their
+        # results are taken in rank order, so the best-ranked match wins
+        tasks = [asyncio.ensure_future(detect_func(frame, cmp_type, None)) for frame in all_frames]
+        try:
+            for i, (frame, task) in enumerate(zip(all_frames, tasks)):
+                try:
+                    modal = await task
+                except Exception as e:
+                    logging.debug(f"Error checking frame {i}: {e}")
+                    continue
                 if modal:
                     frame_info = f"frame {i}: {frame.url[:50] if frame.url else 'about:blank'}"
                     logging.info(f"✓ Modal found in {frame_info}")
                     return modal
-            except Exception as e:
-                logging.debug(f"Error checking frame {i}: {e}")
-                continue
+        finally:
+            # Lower-ranked searches still running once a match is found (or on error)
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
                 
     except Exception as e:
         logging.debug(f"All-frames detection failed: {e}")
@@ -15,6 +15,26 @@ PAGE_LOAD_TIMEOUT = 15_000
 # Wait time after page load for JavaScript execution
 PAGE_READY_WAIT = 1_000
 
+# Maximum time to wait for a consent banner to show up after page load
+BANNER_APPEAR_TIMEOUT = 3_000
+
+# Containers of common CMPs whose visibility means a banner has rendered
+# (readiness hint only, detection itself goes through consent_managers.yml).
+# Generic substrings such as [id*='cookie'] are left out: they already match
+# head scripts and footer links on the first DOM
+CONSENT_HINT_SELECTOR = ", ".join([
+    "#didomi-notice",
+    "#didomi-popup",
+    "#onetrust-banner-sdk",
+    "#onetrust-pc-sdk",
+    "[id^='sp_message_container']",
+    "#CybotCookiebotDialog",
+    "#usercentrics-root",
+    "#tarteaucitronRoot",
+    ".orejime-Notice",
+    ".gdpr-lmd-wall",
+])
+
 # ============================================================================
 # UI Interaction Timeouts (milliseconds)
 # ============================================================================
@@ -28,9 +48,25 @@ ELEMENT_VISIBILITY_CHECK = 100
 # Wait time between modal detection retry attempts
 MODAL_DETECTION_RETRY_WAIT = 500
 
+# Time allowed, right after a click, for a CMP modal to appear in the page
+MODAL_APPEAR_WAIT = 100
+
 # Timeout for clicking elements
 CLICK_TIMEOUT = 5_000
 
+# Maximum number of iframes probed concurrently when searching for a banner
+IFRAME_SEARCH_CONCURRENCY = 4
+
+# Maximum number of interactive elements read from a single banner
+MAX_BANNER_BUTTONS = 200
+
+# Banner text length (chars) above which collapsed sections are not expanded
+BANNER_TEXT_EXPAND_THRESHOLD = 2_000
+
+# How long the per-CMP classification of a page's frames is reused by the
+# detectors (a change in the number of frames invalidates it earlier)
+FRAME_CLASSIFICATION_TTL = 200
+
 # ============================================================================
 # Resource Blocking
 # ============================================================================
@@ -38,6 +74,33 @@ CLICK_TIMEOUT = 5_000
 # Resource types to block for faster page loads
 BLOCKED_RESOURCE_TYPES = ["image", "media", "font"]
 
+# File extensions blocked browser-side through CDP (Network.setBlockedURLs),
+# the URL-based equivalent of BLOCKED_RESOURCE_TYPES. Blocked requests are
+# still reported to the request listener, so trackers behind them are counted.
+# Stylesheets and scripts stay allowed: banners need them to render.
+BLOCKED_URL_EXTENSIONS = [
+    "png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp",
+    "woff", "woff2", "ttf", "otf", "eot",
+    "mp4", "webm", "mov", "mp3", "m4a", "ogg", "wav",
+]
+
+# CDP wildcard patterns, with and without a query string
+BLOCKED_URL_PATTERNS = [
+    pattern
+    for ext in BLOCKED_URL_EXTENSIONS
+    for pattern in (f"*.{ext}", f"*.{ext}?*")
+]
+
+# ============================================================================
+# Screenshots
+# ============================================================================
+
+# Directory audit screenshots are written to
+SCREENSHOT_DIR = "screenshots"
+
+# JPEG quality of audit screenshots (much smaller and faster to encode than PNG)
+SCREENSHOT_JPEG_QUALITY = 70
+
 # ============================================================================
 # User Agents
 # ============================================================================
@@ -57,6 +120,22 @@ DEFAULT_DB_FILE = "crawl_results.db"
 # Default audit database file name
 DEFAULT_AUDIT_DB_FILE = "audit_results.db"
 
+# Seconds the batch writer waits for more finished audits before committing
+WRITER_FLUSH_INTERVAL = 1.0
+
+# Maximum number of audit results written in one commit
+WRITER_MAX_BATCH = 1_000
+
+# ============================================================================
+# Blocklists
+# ============================================================================
+
+# Interval between checks for updated blocklists in long-running processes (seconds)
+BLOCKLISTS_REFRESH_INTERVAL = 3_600
+
+# Age after which blocklists are fetched again (days, see Blocklists.max_age_days)
+BLOCKLISTS_MAX_AGE_DAYS = 7
+
 # ============================================================================
 # Retry Configuration
 # ============================================================================
@@ -66,3 +145,33 @@ MAX_MODAL_DETECTION_RETRIES = 1  # Optimized for speed
 
 # Maximum number of click retries
 MAX_CLICK_RETRIES = 3
+
+# ============================================================================
+# Browser Context Pool
+# ============================================================================
+
+# Number of pre-warmed browser contexts kept ready per browser
+CONTEXT_POOL_SIZE = 4
+
+# Audits served by a pooled context before it is closed and replaced
+CONTEXT_MAX_USES = 50
+
+# ============================================================================
+# Browser Pool
+# ============================================================================
+
+# Number of Chromium instances the API round-robins audits across
+BROWSER_POOL_SIZE = 2
+
+# Audits served by a browser before it is relaunched (caps long-session leaks)
+BROWSER_MAX_AUDITS = 100
+
+# ============================================================================
+# API Result Cache
+# ============================================================================
+
+# Seconds an audit result is served from cache before re-auditing the URL
+AUDIT_CACHE_TTL = 86_400
+
+# Maximum number of audit results kept in memory (least recently used evicted)
+AUDIT_CACHE_MAX_SIZE = 1_024
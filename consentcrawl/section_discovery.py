@@ -23,6 +23,7 @@ All tiers run and results are merged with deduplication.
 Sections are auto-activated during discovery to validate content.
 """
 
+import functools
 import logging
 import os
 import time
@@ -37,16 +38,23 @@ from consentcrawl.audit_schemas import (
     DiscoveredSection, SectionDiscoveryResult,
     AuditConfig
 )
+from consentcrawl.utils import YAML_LOADER
 
 
 MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
 AUDIT_SELECTORS_FILE = f"{MODULE_DIR}/assets/audit_selectors.yml"
 
 
+@functools.lru_cache(maxsize=1)
 def load_audit_selectors():
-    """Load audit selector patterns from YAML file."""
+    """
+    Load audit selector patterns from YAML file.
+
+    The YAML is parsed once per process; callers share the returned dict and
+    must not mutate it.
+    """
     with open(AUDIT_SELECTORS_FILE, "r") as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=YAML_LOADER)
 
 
 # ============================================================================
@@ -9,6 +9,7 @@ This module handles deep exploration of consent UI preferences, extracting:
 Supports 35+ CMP types with generic fallbacks.
 """
 
+import functools
 import logging
 import os
 import yaml
@@ -22,16 +23,24 @@ from consentcrawl.audit_schemas import (
     DiscoveredSection, SectionDiscoveryResult, DiscoveryMethod,
     SectionType, ContentType
 )
+from consentcrawl.constants import MODAL_APPEAR_WAIT
+from consentcrawl.utils import YAML_LOADER
 
 
 MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
 AUDIT_SELECTORS_FILE = f"{MODULE_DIR}/assets/audit_selectors.yml"
 
 
+@functools.lru_cache(maxsize=1)
 def load_audit_selectors():
-    """Load audit selector patterns from YAML file."""
+    """
+    Load audit selector patterns from YAML file.
+
+    The YAML is parsed once per process; callers share the returned dict and
+    must not mutate it.
+    """
     with open(AUDIT_SELECTORS_FILE, "r") as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=YAML_LOADER)
 
 
 async def explore_consent_ui(page: Page, banner_info: BannerInfo, config: AuditConfig) -> Dict[str, Any]:
@@ -380,28 +389,28 @@ async def detect_modal_with_retry(page: Page, cmp_type: Optional[str], config: A
                 
                 elif "onetrust" in normalized_cmp:
                     logging.debug("Trying OneTrust-specific detection")
-                    modal = await detect_onetrust_modal(page)
+                    modal = await detect_onetrust_modal(page, wait_ms=MODAL_APPEAR_WAIT)
                     if modal:
                         logging.info("✓ Modal found via OneTrust detector")
                         return modal
                 
                 elif "didomi" in normalized_cmp:
                     logging.debug("Trying Didomi-specific detection")
-                    modal = await detect_didomi_modal(page)
+                    modal = await detect_didomi_modal(page, wait_ms=MODAL_APPEAR_WAIT)
                     if modal:
                         logging.info("✓ Modal found via Didomi detector")
                         return modal
                 
                 elif "orejime" in normalized_cmp:
                     logging.debug("Trying Orejime-specific detection")
-                    modal = await detect_orejime_modal(page)
+                    modal = await detect_orejime_modal(page, wait_ms=MODAL_APPEAR_WAIT)
                     if modal:
                         logging.info("✓ Modal found via Orejime detector")
                         return modal
                 
                 elif "trust" in normalized_cmp or "commander" in normalized_cmp:
                     logging.debug("Trying Trust Commander-specific detection")
-                    modal = await detect_trust_commander_modal(page)
+                    modal = await detect_trust_commander_modal(page, wait_ms=MODAL_APPEAR_WAIT)
                     if modal:
                         logging.info("✓ Modal found via Trust Commander detector")
                         return modal
@@ -476,7 +485,7 @@ async def detect_modal(page: Page, cmp_type: Optional[str], config: AuditConfig)
                 if iframe_count > 0:
                     logging.debug(f"Adding iframe context for {normalized_cmp_type}: {iframe_selector}")
                     iframe_contexts.insert(0, page.frame_locator(iframe_selector).first)  # Check iframe first
-            except:
+            except Exception:
                 pass
 
     # Stratégie 1 : CMP-specific patterns
@@ -495,7 +504,7 @@ async def detect_modal(page: Page, cmp_type: Optional[str], config: AuditConfig)
                         if await locator.is_visible(timeout=100):
                             logging.info(f"✓ Modal detected with CMP selector in {context_name}: {selector}")
                             return locator
-                    except:
+                    except Exception:
                         continue
         else:
             logging.debug(f"No CMP-specific selectors found for '{normalized_cmp_type}'")
@@ -516,7 +525,7 @@ async def detect_modal(page: Page, cmp_type: Optional[str], config: AuditConfig)
                     if any(kw in text.lower() for kw in keywords):
                         logging.info(f"✓ Modal detected with generic selector in {context_name}: {selector}")
                         return locator
-            except:
+            except Exception:
                 continue
 
     logging.warning("No modal detected with any selector")